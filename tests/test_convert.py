@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""tests.test_convert
+
+Copyright 2012-2015 by Christopher C. Little
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+The full text of the GNU General Public License is available at:
+<http://www.gnu.org/licenses/gpl-3.0.txt>.
+"""
+
+from __future__ import unicode_literals
+import re
+import unittest
+from usfm2osis.convert import (_close_sections, _until, _remove_tag,
+                               _RE_VP, _RE_VP_VALUE)
+
+
+class CloseSectionsTestCases(unittest.TestCase):
+    """Test cases for _close_sections
+    """
+    def test_no_sentinel(self):
+        """Text without the sentinel is returned as it is
+        """
+        self.assertEqual(_close_sections('a\uFDD5b', '\uFDDA', '\uFDD5'),
+                         'a\uFDD5b')
+
+    def test_end_of_document(self):
+        """Without a stopper, the last section closes at the end
+        """
+        self.assertEqual(_close_sections('\uFDDAa\uFDDAb', '\uFDDA', ''),
+                         '\uFDDAa</div>\uFDDA\n\uFDDAb</div>\uFDDA\n')
+
+    def test_stopper(self):
+        """A section closes ahead of the first stopper, not at a later one
+        """
+        self.assertEqual(_close_sections('\uFDDAa\uFDD6b\uFDD5c', '\uFDDA',
+                                         '\uFDD5\uFDD6'),
+                         '\uFDDAa</div>\uFDDA\n\uFDD6b\uFDD5c')
+
+    def test_stopper_not_listed(self):
+        """Other non-characters don't end a section
+        """
+        self.assertEqual(_close_sections('\uFDDAa\uFDDBb', '\uFDDA', '\uFDD5'),
+                         '\uFDDAa\uFDDBb</div>\uFDDA\n')
+
+    def test_empty_section(self):
+        """A sentinel directly followed by a stopper gets no closing tag
+        """
+        self.assertEqual(_close_sections('\uFDDA\uFDD5a', '\uFDDA', '\uFDD5'),
+                         '\uFDDA\uFDD5a')
+
+
+
+class UntilTestCases(unittest.TestCase):
+    """Test cases for _until
+    """
+    def test_terminator(self):
+        """The text up to the first terminator is captured
+        """
+        regex = re.compile(_until(r'\\p\b', r'\\'), re.DOTALL)
+        self.assertEqual(regex.match('a\\q b\n\\p c\\p d').group(1),
+                         'a\\q b\n')
+
+    def test_no_terminator(self):
+        """Text without the terminator doesn't match, even where it holds
+        the terminator's initials
+        """
+        regex = re.compile(_until(r'\\p\b', r'\\'), re.DOTALL)
+        self.assertEqual(regex.match('a\\q b\n\\pi c'), None)
+        self.assertEqual(regex.match('\\q ' * 10000), None)
+
+    def test_no_initials(self):
+        """Text without any of the initials doesn't match
+        """
+        regex = re.compile(_until('<', '<'))
+        self.assertEqual(regex.match('a b c' * 10000), None)
+
+
+
+class RemoveTagTestCases(unittest.TestCase):
+    """Test cases for _remove_tag
+    """
+    def test_value(self):
+        """The first value is returned, and every span is deleted
+        """
+        self.assertEqual(_remove_tag(_RE_VP_VALUE, _RE_VP,
+                                     'a \\vp 1a\\vp* b \\vp 1b\\vp* c'),
+                         ('a  b  c', '1a'))
+
+    def test_no_tag(self):
+        """Text without the tag is returned as it is, with no value
+        """
+        self.assertEqual(_remove_tag(_RE_VP_VALUE, _RE_VP, 'a b'),
+                         ('a b', None))
+
+    def test_line_break(self):
+        """A span running over a line break gives no value, and is kept if
+        there is no other span
+        """
+        text = 'a \\vp 1a\n\\p b\\vp* c'
+        self.assertEqual(_remove_tag(_RE_VP_VALUE, _RE_VP, text),
+                         (text, None))
+
+    def test_value_after_line_break(self):
+        """The value comes from the first span within a line, while the
+        spans running over a line break are deleted as well
+        """
+        self.assertEqual(_remove_tag(_RE_VP_VALUE, _RE_VP,
+                                     'a \\vp 1a\nb\\vp* c \\vp 1b\\vp*'),
+                         ('a  c ', '1b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""tests.test_samples
+
+Copyright 2012-2015 by Christopher C. Little
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+The full text of the GNU General Public License is available at:
+<http://www.gnu.org/licenses/gpl-3.0.txt>.
+"""
+
+from __future__ import unicode_literals
+import io
+import os
+import unittest
+from usfm2osis.convert import ConvertToOSIS
+
+SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       'usfmSamples')
+
+
+class SampleTestCases(unittest.TestCase):
+    """Test cases converting the USFM samples that have an expected output
+    """
+    def test_expected_osis(self):
+        """Compare each {code}_{tag}.usfm sample that has a {code}_{tag}.osis
+        file alongside it with the OSIS in that file
+        """
+        expected_files = sorted(f for f in os.listdir(SAMPLES) if
+                                f.endswith('.osis'))
+        self.assertTrue(expected_files)
+        for expected_file in expected_files:
+            sample = os.path.join(SAMPLES, expected_file[:-5] + '.usfm')
+            with io.open(os.path.join(SAMPLES, expected_file),
+                         encoding='utf-8') as expected:
+                self.assertEqual(ConvertToOSIS(sample), expected.read(),
+                                 expected_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,11 +19,517 @@ The full text of the GNU General Public License is available at:
 
 from __future__ import unicode_literals
 import re
-import codecs
 from encodings.aliases import aliases
 from .bookdata import SPECIAL_BOOKS, PERIPHERALS, INTRO_PERIPHERALS, BOOK_DICT
 from .util import verbose_print
-from ._compat import _unichr
+from ._compat import _range, _unichr
+
+# Regular expressions are compiled once, at import time, rather than on every
+# call to ConvertToOSIS.
+
+# Unicode non-characters are used as sentinels while converting:
+# \uFDD0 book, \uFDD1 chapter, \uFDD2 verse, \uFDD3 paragraph, \uFDD4 title,
+# \uFDD5-\uFDD9 \ms1-5, \uFDDA-\uFDDE \s1-5, \uFDDF notes,
+# \uFDE0 intro list, \uFDE1 intro outline, \uFDE2-\uFDE6 \is1-5
+_BLOCK_SENTINELS = '\uFDD0\uFDD1\uFDD3\uFDD4'
+_MS_SENTINELS = '\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9'
+_S_SENTINELS = '\uFDDA\uFDDB\uFDDC\uFDDD\uFDDE'
+_IS_SENTINELS = '\uFDE2\uFDE3\uFDE4\uFDE5\uFDE6'
+_SECTION_SENTINELS = _BLOCK_SENTINELS + _MS_SENTINELS + _S_SENTINELS
+_LIST_SENTINELS = _SECTION_SENTINELS + '\uFDE0\uFDE1'
+# (sentinel, stoppers) for each section level, outermost first; a section
+# ends at its own sentinel or at any of the stoppers
+_IS_LEVELS = tuple((sentinel, _IS_SENTINELS[:level]) for (level, sentinel) in
+                   enumerate(_IS_SENTINELS))
+_MS_LEVELS = tuple((sentinel, '\uFDD0' + _MS_SENTINELS[:level]) for
+                   (level, sentinel) in enumerate(_MS_SENTINELS))
+_S_LEVELS = tuple((sentinel, '\uFDD0' + _MS_SENTINELS + _S_SENTINELS[:level])
+                  for (level, sentinel) in enumerate(_S_SENTINELS))
+
+
+def _until(terminator, initials):
+    """Return a regex capturing the text up to the first place at which
+    terminator matches, equivalent to '(.*?)(?=terminator)' (with DOTALL).
+
+    Keyword arguments:
+    terminator -- A regex, which must only be able to match starting at one of
+    the initials.
+    initials -- The characters with which terminator can begin, as the body
+    of a character class.
+
+    Runs of characters other than the initials are consumed without trying
+    terminator, and the text can only be split into such runs in one way, so
+    a failed match backtracks in linear rather than quadratic time.
+    """
+    return ('([^' + initials + ']*(?:(?!' + terminator + ')[' + initials +
+            '][^' + initials + ']*)*)(?=' + terminator + ')')
+
+
+def _line_until(terminator, initials):
+    """Return a regex like _until(), but which leaves a newline directly before
+    terminator out of the captured text, capturing it (or '') as a further
+    group, so that the closing tag can be placed before it.
+
+    Keyword arguments:
+    terminator -- A regex, which must only be able to match starting at one of
+    the initials.
+    initials -- The characters with which terminator can begin, as the body
+    of a character class.
+    """
+    return _until(r'\n?(?:' + terminator + ')', initials + '\n') + r'(\n?)'
+
+
+# -- Preprocessing
+# the name of a tag, without any trailing digits, so that e.g. \s2 gives 's'
+_RE_TAG_NAME = re.compile(r'\\([a-z]+)')
+_RE_LEADING_NONTAG = re.compile('\n' + r'\s*([^\\s])')
+# only try to match at the start of a whitespace run, so that long runs
+# without a newline cannot make the match quadratic
+_RE_TRAILING_SPACE = re.compile(r'(?<!\s)\s+' + '\n')
+# CR to LF and XML entity escapes, applied in a single translate() pass
+_PREPROCESS_TRANSLATION = {ord('\r'): '\n', ord('&'): '&amp;',
+                           ord('<'): '&lt;', ord('>'): '&gt;'}
+
+# -- Relaxed conformance remaps
+_RE_RELAXED_TR = re.compile(r'\\tr\d\b')
+_RELAXED_REMAPS = tuple((re.compile(pattern), replacement) for
+                        (pattern, replacement) in (
+    (r'\\pub\b\s', r'\\periph Publication Data' + '\n'),
+    (r'\\toc\b\s', r'\\periph Table of Contents' + '\n'),
+    (r'\\pref\b\s', r'\\periph Preface' + '\n'),
+    (r'\\maps\b\s', r'\\periph Map Index' + '\n'),
+    (r'\\cov\b\s', r'\\periph Cover' + '\n'),
+    (r'\\spine\b\s', r'\\periph Spine' + '\n'),
+    (r'\\pubinfo\b\s', r'\\periph Publication Information' + '\n'),
+    (r'\\intro\b\s', r'\\id INT' + '\n'),
+    (r'\\conc\b\s', r'\\id CNC' + '\n'),
+    (r'\\glo\b\s', r'\\id GLO' + '\n'),
+    (r'\\idx\b\s', r'\\id TDX' + '\n')))
+
+# -- Identification
+_RE_IDE = re.compile(br'\\ide\s+(.+)' + b'\n')
+_RE_ID = re.compile(r'\\id\s+([A-Z0-9]{3})\b\s*([^\\' + '\n]*?)\n' +
+                    r'(.*)(?=\\id|$)', re.DOTALL)
+# book <div> start tags, keyed by USFM book code
+_BOOK_OPENINGS = dict((code, '\uFDD0<div type="book" osisID="' + osis_id +
+                       '">\n') for (code, osis_id) in BOOK_DICT.items())
+_RE_SPECIAL_BOOK = re.compile('<div type="book" osisID="(' +
+                              '|'.join(SPECIAL_BOOKS) + ')">')
+# The line-level identification tags are independent of one another, so they
+# are converted together in one pass. Each entry is (name, pattern, template);
+# every pattern is wrapped in a group with the entry's name, which is how the
+# replacement template gets looked up.
+_IDENTIFICATION_TAGS = (
+    # \ide_<ENCODING>: deleted, since it is handled when the file is read
+    ('ide', r'ide\b.*' + '\n', ''),
+    # \sts_<STATUS CODE>
+    ('sts', r'sts\b\s+(?P<sts_text>.+)\s*' + '\n',
+     r'<milestone type="x-usfm-sts" n="\g<sts_text>"/>' + '\n'),
+    # \rem_text...
+    ('rem', r'rem\b\s+(?P<rem_text>.+)', r'<!-- rem - \g<rem_text> -->'),
+    # \h#_text...
+    ('h', r'h\b\s+(?P<h_text>.+)\s*' + '\n',
+     r'<title type="runningHead">\g<h_text></title>' + '\n'),
+    ('h_num', r'h(?P<h_n>\d)\b\s+(?P<h_num_text>.+)\s*' + '\n',
+     r'<title type="runningHead" n="\g<h_n>">\g<h_num_text></title>' + '\n'),
+    # \toc1_text..., \toc2_text..., \toc3_text...
+    ('toc', r'toc(?P<toc_n>[123])\b\s+(?P<toc_text>.+)\s*' + '\n',
+     r'<milestone type="x-usfm-toc\g<toc_n>" n="\g<toc_text>"/>' + '\n'))
+_RELAXED_IDENTIFICATION_TAGS = _IDENTIFICATION_TAGS + (
+    # \restore_text...
+    ('restore', r'restore\b\s+(?P<restore_text>.+)',
+     r'<!-- restore - \g<restore_text> -->'),)
+_IDENTIFICATION_TEMPLATES = dict((name, template) for (name, _, template) in
+                                 _RELAXED_IDENTIFICATION_TAGS)
+_RE_IDENTIFICATION = re.compile(r'\\(?:' + '|'.join(
+    '(?P<' + name + '>' + pattern + ')'
+    for (name, pattern, _) in _IDENTIFICATION_TAGS) + ')')
+_RE_IDENTIFICATION_RELAXED = re.compile(r'\\(?:' + '|'.join(
+    '(?P<' + name + '>' + pattern + ')'
+    for (name, pattern, _) in _RELAXED_IDENTIFICATION_TAGS) + ')')
+
+# -- Introductions
+_INTRO_TAG_NAMES = frozenset(('imt', 'imte', 'is', 'ip', 'ipi', 'im', 'imi',
+                              'ipq', 'imq', 'ipr', 'iq', 'ib', 'ili', 'iot',
+                              'io', 'ior', 'iex', 'iqt', 'ie'))
+_RE_IMT = re.compile(r'\\imt(\d?)\s+(.+)')
+_RE_IMTE = re.compile(r'\\imte(\d?)\b\s+(.+)')
+# a heading's title ends at the end of its line or, with any whitespace
+# before it, at the next heading of its family
+_RE_IS = re.compile(r'\\is([1-5]?)\s+(.+?)(?:[^\S\n]*(?=\\is[1-5]?\s)|$)',
+                    re.MULTILINE)
+_IS_OPENINGS = {
+    '': '\uFDE2<div type="section" subType="x-introduction"><title>',
+    '1': '\uFDE2<div type="section" subType="x-introduction"><title>',
+    '2': '\uFDE3<div type="subSection" subType="x-introduction"><title>',
+    '3': '\uFDE4<div type="x-subSubSection" subType="x-introduction"><title>',
+    '4': '\uFDE5<div type="x-subSubSubSection" subType="x-introduction">' +
+         '<title>',
+    '5': '\uFDE6<div type="x-subSubSubSubSection" subType="x-introduction">' +
+         '<title>'}
+_IP_END = (r'\\(?:i?m|i?p|lit|cls|tr|io|iq|i?li|iex?|s|c)\b|' +
+           r'<(?:/?div|p|closer)\b')
+_RE_IP = re.compile(r'\\ip\s+' + _until(_IP_END, r'\\<'), re.DOTALL)
+_IP_TYPED_END = (r'\\(?:i?m|i?p|lit|cls|tr|io[t\d]?|ipi|iq|i?li|iex?|s|c)\b|' +
+                 r'<(?:/?div|p|closer)\b')
+_RE_IP_TYPED = re.compile(r'\\(ipi|im|ipq|imq|ipr)\s+' +
+                          _until(_IP_TYPED_END, r'\\<'), re.DOTALL)
+_IP_TYPES = {'ipi': 'x-indented', 'im': 'x-noindent',
+             'imi': 'x-noindent-indented', 'ipq': 'x-quote',
+             'imq': 'x-noindent-quote', 'ipr': 'x-right'}
+_IQ_END = '[' + _BLOCK_SENTINELS + r']|\\(?:iq\d?|fig|q\d?|b)\b|<title\b'
+_RE_IQ = re.compile(r'\\iq\b\s*' + _until(_IQ_END, _BLOCK_SENTINELS + r'\\<'),
+                    re.DOTALL)
+_RE_IQ_NUM = re.compile(r'\\iq(\d)\b\s*' +
+                        _until(_IQ_END, _BLOCK_SENTINELS + r'\\<'), re.DOTALL)
+_RE_IB = re.compile(r'\\ib\b\s?')
+_ILI_END = ('[' + _BLOCK_SENTINELS + r']|\\(?:ili\d?|c|p|io[t\d]?|iex?)\b|' +
+            r'<(?:lb|title|item|\?div)\b')
+_RE_ILI = re.compile(r'\\ili\b\s*' +
+                     _until(_ILI_END, _BLOCK_SENTINELS + r'\\<'), re.DOTALL)
+_RE_ILI_NUM = re.compile(r'\\ili(\d)\b\s*' +
+                         _until(_ILI_END, _BLOCK_SENTINELS + r'\\<'),
+                         re.DOTALL)
+_RE_INTRO_LIST = re.compile('(<item [^' + _BLOCK_SENTINELS + ']+</item>)',
+                            re.DOTALL)
+_IO_END = ('[' + _BLOCK_SENTINELS + r']|\\(?:io[t\d]?|iex?|c|p)\b|' +
+           r'<(?:lb|title|item|\?div)\b')
+_RE_IO = re.compile(r'\\io\b\s*' + _until(_IO_END, _BLOCK_SENTINELS + r'\\<'),
+                    re.DOTALL)
+_RE_IO_NUM = re.compile(r'\\io(\d)\b\s*' +
+                        _until(_IO_END, _BLOCK_SENTINELS + r'\\<'), re.DOTALL)
+_RE_IOT = re.compile(r'\\iot\b\s*' + _until(_IO_END, _BLOCK_SENTINELS + r'\\<'),
+                     re.DOTALL)
+_RE_INTRO_OUTLINE = re.compile('(<item [^' + _BLOCK_SENTINELS +
+                               '\uFDE0]+</item>)', re.DOTALL)
+# (pattern, replacement) for the introduction tags that need no more than a
+# plain substitution, in the order in which they are applied
+_INTRO_REMAPS = (
+    # \ior_text...\ior*
+    (re.compile(r'\\ior\b\s+(.+?)\\ior\*', re.DOTALL),
+     r'<reference>\1</reference>'),
+    # \iex  # TODO: look for example; I have no idea what this would look like in context
+    (re.compile(r'\\iex\b\s*(.+?)' +
+                r'?=(\s*(\\c|</div type="book">' + '\uFDD0))', re.DOTALL),
+     r'<div type="bridge">\1</div>'),
+    # \iqt_text...\iqt*
+    (re.compile(r'\\iqt\s+(.+?)\\iqt\*', re.DOTALL),
+     r'<q subType="x-introduction">\1</q>'),
+    # \ie
+    (re.compile(r'\\ie\b\s*'), '<milestone type="x-usfm-ie"/>'))
+
+# -- Titles, Headings, and Labels
+# as for \is#, a title ends at the next heading of its family
+_RE_MS = re.compile(r'\\ms([1-5]?)\s+(.+?)(?:[^\S\n]*(?=\\ms[1-5]?\s)|$)',
+                    re.MULTILINE)
+_MS_OPENINGS = {'': '\uFDD5<div type="majorSection"><title>',
+                '1': '\uFDD5<div type="majorSection"><title>',
+                '2': '\uFDD6<div type="majorSection" n="2"><title>',
+                '3': '\uFDD7<div type="majorSection" n="3"><title>',
+                '4': '\uFDD8<div type="majorSection" n="4"><title>',
+                '5': '\uFDD9<div type="majorSection" n="5"><title>'}
+_RE_MR = re.compile(r'\\mr\s+(.+)')
+_RE_S = re.compile(r'\\s([1-5]?)\s+(.+?)(?:[^\S\n]*(?=\\s[1-5]?\s)|$)',
+                   re.MULTILINE)
+_S_OPENINGS = {'': '\uFDDA<div type="section"><title>',
+               '1': '\uFDDA<div type="section"><title>',
+               '2': '\uFDDB<div type="subSection"><title>',
+               '3': '\uFDDC<div type="x-subSubSection"><title>',
+               '4': '\uFDDD<div type="x-subSubSubSection"><title>',
+               '5': '\uFDDE<div type="x-subSubSubSubSection"><title>'}
+_RE_SS = re.compile(r'\\ss\s+')
+_RE_SSS = re.compile(r'\\sss\s+')
+# (pattern, replacement) for the headings and labels that need no more than a
+# plain substitution, in the order in which they are applied
+_HEADING_REMAPS = (
+    # \sr_text...
+    (re.compile(r'\\sr\s+(.+)'),
+     '\uFDD4<title type="scope"><reference>' + r'\1</reference></title>'),
+    # \r_text...
+    (re.compile(r'\\r\s+(.+)'),
+     '\uFDD4<title type="parallel"><reference type="parallel">' +
+     r'\1</reference></title>'),
+    # \rq_text...\rq*
+    (re.compile(r'\\rq\s+(.+?)\\rq\*', re.DOTALL),
+     r'<reference type="source">\1</reference>'),
+    # \d_text...
+    (re.compile(r'\\d\s+(.+)'),
+     '\uFDD4<title canonical="true" type="psalm">' + r'\1</title>'),
+    # \sp_text...
+    (re.compile(r'\\sp\s+(.+)'), r'<speaker>\1</speaker>'))
+_RE_MT = re.compile(r'\\mt(\d?)\s+(.+)')
+_RE_MTE = re.compile(r'\\mte(\d?)\s+(.+)')
+
+# -- Chapters and Verses
+_RE_C = re.compile(r'\\c\s+([^\s]+)\b(.+?)(?=(\\c\s+|</div type="book"))',
+                   re.DOTALL)
+# the value of \cp, \ca, \vp and \va is taken from a match within a line,
+# but every span, even one running over a line break, is deleted
+_RE_CP_VALUE = re.compile(r'\\cp\s+(.+?)(?=(\\|\s))')
+_RE_CP = re.compile(r'\\cp\s+(.+?)(?=(\\|\s))', re.DOTALL)
+_RE_CP_ID = re.compile(r'"\$BOOK\$\.([^"\.]+)"')
+_RE_CA_VALUE = re.compile(r'\\ca\s+(.+?)\\ca\*')
+_RE_CA = re.compile(r'\\ca\s+(.+?)\\ca\*', re.DOTALL)
+_RE_CA_ID = re.compile(r'(osisID="\$BOOK\$\.[^"\.]+)"')
+_RE_CL = re.compile(r'\\cl\s+(.+)')
+_RE_CD = re.compile(r'\\cd\b\s+(.+)')
+_RE_V = re.compile(r'\\v\s+([^\s]+)\b\s*(.+?)(?=(\\v\s+|</div type="book"|<chapter eID))', re.DOTALL)
+_RE_VP_VALUE = re.compile(r'\\vp\s+(.+?)\\vp\*')
+_RE_VP = re.compile(r'\\vp\s+(.+?)\\vp\*', re.DOTALL)
+_RE_VP_ID = re.compile(r'"\$BOOK\$\.\$CHAP\$\.([^"\.]+)"')
+_RE_VA_VALUE = re.compile(r'\\va\s+(.+?)\\va\*')
+_RE_VA = re.compile(r'\\va\s+(.+?)\\va\*', re.DOTALL)
+_RE_VA_ID = re.compile(r'(osisID="\$BOOK\$\.\$CHAP\$\.[^"\.]+)"')
+_RE_VERSE_RANGE_ID = re.compile(r'\$BOOK\$\.\$CHAP\$\.(\d+-\d+)"')
+_RE_VERSE_SERIES_ID = re.compile(r'\$BOOK\$\.\$CHAP\$\.(\d+(,\d+)+)"')
+
+# -- Paragraphs
+_PARAGRAPH_TAGS = 'pc|pr|m|pmo|pm|pmc|pmr|pi|pi1|pi2|pi3|pi4|pi5|mi|nb'
+_RELAXED_PARAGRAPH_TAGS = _PARAGRAPH_TAGS + '|phi|ps|psi|p1|p2|p3|p4|p5'
+_P_TYPES = {'pc': 'x-center', 'pr': 'x-right', 'm': 'x-noindent',
+            'pmo': 'x-embedded-opening', 'pm': 'x-embedded',
+            'pmc': 'x-embedded-closing', 'pmr': 'x-right',
+            'pi': 'x-indented-1', 'pi1': 'x-indented-1',
+            'pi2': 'x-indented-2', 'pi3': 'x-indented-3',
+            'pi4': 'x-indented-4', 'pi5': 'x-indented-5',
+            'mi': 'x-noindent-indented', 'nb': 'x-nobreak',
+            'phi': 'x-indented-hanging', 'ps': 'x-nobreakNext',
+            'psi': 'x-nobreakNext-indented', 'p1': 'x-level-1',
+            'p2': 'x-level-2', 'p3': 'x-level-3', 'p4': 'x-level-4',
+            'p5': 'x-level-5'}
+_RE_P = re.compile(r'\\p\s+' + _until(
+    r'\\(?:i?m|i?p|lit|cls|tr|p|' + _PARAGRAPH_TAGS +
+    r')\b|<chapter eID|<(?:/?div|p|closer)\b', r'\\<'), re.DOTALL)
+_RE_P_RELAXED = re.compile(r'\\p\s+' + _until(
+    r'\\(?:i?m|i?p|lit|cls|tr|p|' + _RELAXED_PARAGRAPH_TAGS +
+    r')\b|<chapter eID|<(?:/?div|p|closer)\b', r'\\<'), re.DOTALL)
+_RE_P_TYPED = re.compile(r'\\(' + _PARAGRAPH_TAGS + r')\s+' + _until(
+    r'\\(?:i?m|i?p|lit|cls|tr|' + _PARAGRAPH_TAGS +
+    r')\b|<chapter eID|<(?:/?div|p|closer)\b', r'\\<'), re.DOTALL)
+_RE_P_TYPED_RELAXED = re.compile(
+    r'\\(' + _RELAXED_PARAGRAPH_TAGS + r')\s+' + _until(
+        r'\\(?:i?m|i?p|lit|cls|tr|' + _RELAXED_PARAGRAPH_TAGS +
+        r')\b|<chapter eID|<(?:/?div|p|closer)\b', r'\\<'), re.DOTALL)
+_CLS_END = (r'\\(?:i?m|i?p|lit|cls|tr)\b|<chapter eID|' +
+            r'<(?:/?div|p|closer)\b')
+# like _until(), but capturing at least one character, as '(.+?)' would
+_RE_CLS = re.compile(r'\\m\s+(.' + _until(_CLS_END, r'\\<')[1:], re.DOTALL)
+_RE_PH = re.compile(r'\\ph\b\s*')
+_RE_PH_NUM = re.compile(r'\\ph(\d)\b\s*')
+_LI_END = ('[' + _LIST_SENTINELS + r']|\\li\d?\b|' +
+           r'<(?:lb|title|item|/?div|/?chapter)\b')
+_RE_LI = re.compile(r'\\li\b\s*' +
+                    _line_until(_LI_END, _LIST_SENTINELS + r'\\<'), re.DOTALL)
+_RE_LI_NUM = re.compile(r'\\li(\d)\b\s*' +
+                        _line_until(_LI_END, _LIST_SENTINELS + r'\\<'),
+                        re.DOTALL)
+_RE_LIST = re.compile('(<item [^' + _LIST_SENTINELS + ']+</item>)', re.DOTALL)
+_RE_B = re.compile(r'\\b\b\s?')
+
+# -- Poetry
+_RE_QA = re.compile(r'\\qa\s+(.+)')
+_RE_QAC = re.compile(r'\\qac\s+(.+?)\\qac\*', re.DOTALL)
+_RE_QS = re.compile(r'\\qs\b\s(.+?)\\qs\*', re.DOTALL)
+_Q_END = ('[' + _SECTION_SENTINELS + r']|\\(?:q\d?|fig)\b|' +
+          r'<(?:l|lb|title|list|/?div)\b')
+_RE_Q = re.compile(r'\\q\b\s*' + _until(_Q_END, _SECTION_SENTINELS + r'\\<'),
+                   re.DOTALL)
+_RE_Q_NUM = re.compile(r'\\q(\d)\b\s*' +
+                       _until(_Q_END, _SECTION_SENTINELS + r'\\<'), re.DOTALL)
+_RE_Q_TYPED = re.compile(r'\\(qr|qc|qm\d)\b\s*' +
+                         _until(_Q_END, _SECTION_SENTINELS + r'\\<'),
+                         re.DOTALL)
+_Q_TYPES = {'qr': 'x-right', 'qc': 'x-center',
+            'qm': 'x-embedded" level="1', 'qm1': 'x-embedded" level="1',
+            'qm2': 'x-embedded" level="2', 'qm3': 'x-embedded" level="3',
+            'qm4': 'x-embedded" level="4', 'qm5': 'x-embedded" level="5'}
+_RE_LG = re.compile('(<l [^' + _SECTION_SENTINELS + ']+</l>)', re.DOTALL)
+_RE_LG_BREAK = re.compile('(<lg>.+?</lg>)', re.DOTALL)
+
+# -- Tables
+_TABLE_TAG_NAMES = frozenset(('tr', 'th', 'thr', 'tc', 'tcr'))
+_RE_TR = re.compile(r'\\tr\b\s*' +
+                    _until('[' + _BLOCK_SENTINELS + r']|\\tr\s|<(?:lb|title)\b',
+                           _BLOCK_SENTINELS + r'\\<'), re.DOTALL)
+_RE_CELL = re.compile(r'\\(thr?|tcr?)\d*\b\s*' +
+                      _until(r'\\t[hc]|</row', r'\\<'), re.DOTALL)
+_CELL_TYPES = {'th': ' role="label"', 'thr': ' role="label" type="x-right"',
+               'tc': '', 'tcr': ' type="x-right"'}
+_RE_TABLE = re.compile(r'(<row>.*?</row>)(?=([' + _BLOCK_SENTINELS +
+                       r']|\\tr\s|<(lb|title)\b))', re.DOTALL)
+
+# -- Footnotes
+_RE_FDC = re.compile(r'\\fdc\b\s(.+?)\\fdc\b\*')
+_NOTE_FIELDS = {'fq': ('<catchWord>', '</catchWord>'),
+                'fqa': ('<rdg type="alternate">', '</rdg>'),
+                'fr': ('<reference type="annotateRef">', '</reference>'),
+                'fk': ('<catchWord>', '</catchWord>'),
+                'fl': ('<label>', '</label>')}
+# \fq and \fqa end at the next \ft, \fr, \fk and \fl end after it
+_RE_FQ_FQA = re.compile(r'\\f(q|qa)\b\s(.+?)(?=(\\f|' + '\uFDDF))')
+_RE_FT = re.compile(r'\\ft\s')
+_RE_FR_FK_FL = re.compile(r'\\f(r|k|l)\b\s(.+?)(?=(\\f|' + '\uFDDF))')
+_RE_FP = re.compile(r'\\fp\b\s(.+?)(?=(\\fp|$))')
+_RE_FP_LEAD = re.compile(r'(<note\b[^>]*?>)(.*?)<p>')
+_RE_FV = re.compile(r'\\fv\b\s(.+?)(?=(\\f|' + '\uFDDF))')
+_RE_NOTE_CLOSERS = re.compile(r'\\f(q|qa|t|r|k|l|p|v)\*')
+_RE_F = re.compile(r'\\f\s+([^\s\\]+)?\s*(.+?)\s*\\f\*', re.DOTALL)
+_RE_FE = re.compile(r'\\fe\s+([^\s\\]+?)\s*(.+?)\s*\\fe\*', re.DOTALL)
+_RE_NOTE = re.compile(r'(<note\b[^>]*>' + _until('</note>', '<') + '</note>)')
+_RE_FM = re.compile(r'\\fm\b\s(.+?)\\fm\*')
+
+# -- Cross References
+_RE_XREF_EDITIONS = re.compile(r'\\x(ot|nt|dc)\b\s(.+?)\\x\1\b\*')
+_XREF_FIELDS = {'q': ('<catchWord>', '</catchWord>'),
+                'o': ('<reference type="annotateRef">', '</reference>'),
+                'k': ('<catchWord>', '</catchWord>'),
+                't': ('<reference>', '</reference>')}
+_RE_XREF_FIELDS = re.compile(r'\\x(q|o|k|t)\b\s(.+?)(?=(\\x|' + '\uFDDF))')
+_XREF_SEE = {'xtSee': 'See: ', 'xtSeeAlso': 'See also: '}
+_RE_XREF_SEE = re.compile(r'\\(xtSee|xtSeeAlso)\b\s(.+?)\\\1\b\*')
+_RE_XREF_CLOSERS = re.compile(r'\\x(q|t|o|k)\*')
+_RE_X = re.compile(r'\\x\s+([^\s]+?)\s+(.+?)\s*\\x\*', re.DOTALL)
+_RE_XREF_NOTE = re.compile(r'(<note [^>]*?type="crossReference"[^>]*>' +
+                           _until('</note>', '<') + '</note>)')
+
+# -- Special Text
+_SPECIAL_TEXT_TAGS = {
+    'add': ('<transChange type="added">', '</transChange>'),
+    'wj': ('<q who="Jesus" marker="">', '</q>'),
+    'nd': ('<divineName>', '</divineName>'),
+    'pn': ('<name>', '</name>'),
+    'qt': ('<seg type="otPassage">', '</seg>'),  # TODO:should this be <q>?
+    'sig': ('<signed>', '</signed>'),
+    # semantic incongruity: (ordinal -> superscript)
+    'ord': ('<hi type="super">', '</hi>'),
+    'tl': ('<foreign>', '</foreign>'),
+    'bk': ('<name type="x-workTitle">', '</name>'),
+    'k': ('<seg type="keyword">', '</seg>')}
+_RE_SPECIAL_TEXT = re.compile(r'\\(add|wj|nd|pn|qt|sig|ord|tl|bk|k)\s+' +
+                              r'(.+?)\\\1\*', re.DOTALL)
+_SPECIAL_TEXT_TAG_NAMES = frozenset(_SPECIAL_TEXT_TAGS).union(
+    ('lit', 'dc', 'sls', 'addpn'))
+_RE_LIT = re.compile(r'\\lit\s+' + _until(
+    r'\\(?:i?m|i?p|nb|lit|cls|tr)\b|<(?:chapter eID|/?div|p|closer)\b',
+    r'\\<'), re.DOTALL)
+_RE_DC = re.compile(r'\\dc\b\s*(.+?)\\dc\*', re.DOTALL)
+_RE_SLS = re.compile(r'\\sls\b\s*(.+?)\\sls\*', re.DOTALL)
+_RE_ADDPN = re.compile(r'\\addpn\s+(.+?)\\addpn\*', re.DOTALL)
+_RE_K_NUM = re.compile(r'\\k([1-5])\s+(.+?)\\k\1\*', re.DOTALL)
+
+# -- Character Styling
+_STYLE_TAGS = {
+    'em': ('<hi type="emphasis">', '</hi>'),
+    'bd': ('<hi type="bold">', '</hi>'),
+    'it': ('<hi type="italic">', '</hi>'),
+    'bdit': ('<hi type="bold"><hi type="italic">', '</hi></hi>'),
+    'no': ('<hi type="normal">', '</hi>'),
+    'sc': ('<hi type="small-caps">', '</hi>')}
+_RE_STYLE = re.compile(r'\\(em|bd|it|bdit|no|sc)\s+(.+?)\\\1\*', re.DOTALL)
+
+# -- Spacing and Breaks
+_RE_PB = re.compile(r'\\pb\s*')
+
+# -- Special Features
+_RE_FIG = re.compile(r'\\fig\b\s+([^\|]*)\s*\|([^\|]*)\s*\|([^\|]*)\s*\|' +
+                     r'([^\|]*)\s*\|([^\|]*)\s*\|([^\|]*)\s*\|([^\\]*)\s*\\fig\*')
+_RE_NDX = re.compile(r'\\ndx\s+(.+?)(\s*)\\ndx\*', re.DOTALL)
+_RE_PRO = re.compile(r'([^\s]+)(\s*)\\pro\s+(.+?)(\s*)\\pro\*', re.DOTALL)
+_W_INDEXES = {'w': 'Glossary', 'wg': 'Greek', 'wh': 'Hebrew',
+              'wr': 'Reference'}
+_RE_W = re.compile(r'\\(w|wg|wh)\s+(.+?)(\s*)\\\1\*', re.DOTALL)
+_RE_W_RELAXED = re.compile(r'\\(w|wg|wh|wr)\s+(.+?)(\s*)\\\1\*',
+                           re.DOTALL)
+
+# -- Peripherals
+_RE_PERIPH = re.compile(r'\\periph\s+([^' + '\n' + r']+)\s*' + '\n' +
+                        r'(.+?)(?=(</div type="book">|\\periph\s+))',
+                        re.DOTALL)
+
+# -- Study Bible Content
+_RE_EF = re.compile(r'\\ef\s+([^\s\\]+?)\s*(.+?)\s*\\ef\*', re.DOTALL)
+_RE_EX = re.compile(r'\\ex\s+([^\s]+?)\s+(.+?)\s*\\ex\*', re.DOTALL)
+_RE_ESB = re.compile(r'\\esb\b\s*(.+?)\\esbe\b\s*', re.DOTALL)
+_RE_CAT = re.compile(r'\\cat\b\s+(.+?)\\cat\*')
+
+# -- Private Use Extensions
+_RE_Z_SPAN = re.compile(r'\\z([^\s]+)\s(.+?)(\\z\1\*)', re.DOTALL)
+_RE_Z = re.compile(r'\\z([^\s]+)')
+
+# -- Postprocessing
+_RE_BOOK_ID = re.compile(r'<div type="book" osisID="([^"]+?)"')
+_RE_CHAPTER_ID = re.compile(r'<chapter osisID="[^\."]+\.([^"]+)')
+_RE_VERSE_END_AFTER_CHAPTER = re.compile(
+    '(\uFDD3<chapter eID=.+?\n)(<verse eID=.+?>\uFDD2)\n?')
+_RE_MS_END_BEFORE_CHAPTER = re.compile(
+    '([\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9]</div>)' +
+    '([^\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9]*<chapter eID.+?>)')
+_RE_VERSE_END_AFTER_P = re.compile(
+    '(\uFDD3</p>\n?\uFDD3<p>)\n?(<verse eID=.+?>\uFDD2)\n?')
+_RE_VERSE_END_AFTER_NEWLINE = re.compile('\n(<verse eID=.+?>\uFDD2)')
+_RE_VERSES_AFTER_L = re.compile(
+    '\n*(<l.+?>)(<verse eID=.+?>[\uFDD2\n]*<verse osisID=.+?>)')
+_RE_NOTE_AFTER_L = re.compile('(</l>)(<note .+?</note>)')
+_RE_END_TAG_ATTRIBUTES = re.compile(r'(</[^\s>]+) [^>]*>')
+# deletes the Unicode non-characters U+FDD0..U+FDEF used as markers
+_NONCHARACTER_DELETION = dict.fromkeys(_range(0xFDD0, 0xFDF0))
+# block end tags and milestones that whitespace is moved after, in the order
+# in which they used to be handled one at a time
+_END_BLOCKS = ('p', 'div', 'note', 'l', 'lg', 'chapter', 'verse', 'head',
+               'title', 'item', 'list')
+_END_BLOCK_RANKS = dict((name, rank) for (rank, name) in
+                        enumerate(_END_BLOCKS))
+_END_BLOCK = (r'(?:</(' + '|'.join(_END_BLOCKS) + r')>|<(' +
+              '|'.join(_END_BLOCKS) + r') eID=[^/>]+/>)')
+_RE_END_BLOCK = re.compile(r'(\s*)' + _END_BLOCK)
+_RE_END_BLOCK_RUN = re.compile(r'(?:\s*' + _END_BLOCK + ')+')
+_RE_SPACES_BEFORE_END_TAGS = re.compile(' +((</[^>]+>)+) *')
+_RE_MULTIPLE_SPACES = re.compile('  +')
+_RE_BLANK_LINES = re.compile(' ?\n\n+')
+# any tag left over once conversion is done, reported in debug mode
+_RE_UNHANDLED_TAG = re.compile(r'\\[^\s]*')
+
+
+def _close_sections(osis, sentinel, stoppers):
+    """Close every section opened by a sentinel non-character, returning the
+    processed text as a string.
+    The closing </div> goes ahead of the next occurrence of the sentinel or of
+    any of the stoppers, or at the end of the document.
+
+    Keyword arguments:
+    osis -- The document as a string.
+    sentinel -- The non-character marking the start of a section.
+    stoppers -- A string of further non-characters that end a section.
+    """
+    if sentinel not in osis:
+        return osis
+    parts = osis.split(sentinel)
+    for i in range(1, len(parts)):
+        part = parts[i]
+        end = len(part)
+        for stopper in stoppers:
+            found = part.find(stopper, 0, end)
+            if found != -1:
+                end = found
+        if end:
+            parts[i] = part[:end] + '</div>' + sentinel + '\n' + part[end:]
+    return sentinel.join(parts)
+
+
+def _remove_tag(value_regex, regex, text):
+    """Find the value of a tag and delete the tag from text, returning the
+    text and the value (or None) as a tuple.
+    The text is left as it is if value_regex doesn't match.
+
+    Keyword arguments:
+    value_regex -- A compiled regex whose first group is the value.
+    regex -- A compiled regex matching every span to delete.
+    text -- The chapter or verse text.
+    """
+    value = value_regex.search(text)
+    if not value:
+        return text, None
+    return regex.sub('', text), value.group(1)
 
 
 def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
@@ -47,15 +553,11 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
 
         """
         # lines should never start with non-tags
-        osis = re.sub('\n\s*([^\\\s])', r' \1', osis)  # TODO: test this
-        # convert CR to LF
-        osis = osis.replace('\r', '\n')
+        osis = _RE_LEADING_NONTAG.sub(r' \1', osis)  # TODO: test this
+        # convert CR to LF & replace with XML entities, as necessary
+        osis = osis.translate(_PREPROCESS_TRANSLATION)
         # lines should never end with whitespace (other than \n)
-        osis = re.sub('\s+\n', '\n', osis)
-        # replace with XML entities, as necessary
-        osis = osis.replace('&', '&amp;')
-        osis = osis.replace('<', '&lt;')
-        osis = osis.replace('>', '&gt;')
+        osis = _RE_TRAILING_SPACE.sub('\n', osis)
 
         # osis = re.sub('\n' + r'(\\[^\s]+\b\*)', r' \1', osis)
 
@@ -75,33 +577,14 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
             return osis
 
         # \tr#: DEP: map to \tr
-        osis = re.sub(r'\\tr\d\b', r'\\tr', osis)
+        osis = _RE_RELAXED_TR.sub(r'\\tr', osis)
 
         # remapped 2.0 periphs
-        # \pub
-        osis = re.sub(r'\\pub\b\s', '\\periph Publication Data\n', osis)
-        # \toc : \periph Table of Contents
-        osis = re.sub(r'\\toc\b\s', '\\periph Table of Contents\n', osis)
-        # \pref
-        osis = re.sub(r'\\pref\b\s', '\\periph Preface\n', osis)
-        # \maps
-        osis = re.sub(r'\\maps\b\s', '\\periph Map Index\n', osis)
-        # \cov
-        osis = re.sub(r'\\cov\b\s', '\\periph Cover\n', osis)
-        # \spine
-        osis = re.sub(r'\\spine\b\s', '\\periph Spine\n', osis)
-        # \pubinfo
-        osis = re.sub(r'\\pubinfo\b\s', '\\periph Publication Information\n',
-                      osis)
-
-        # \intro
-        osis = re.sub(r'\\intro\b\s', '\\id INT\n', osis)
-        # \conc
-        osis = re.sub(r'\\conc\b\s', '\\id CNC\n', osis)
-        # \glo
-        osis = re.sub(r'\\glo\b\s', '\\id GLO\n', osis)
-        # \idx
-        osis = re.sub(r'\\idx\b\s', '\\id TDX\n', osis)
+        # \pub, \toc, \pref, \maps, \cov, \spine, \pubinfo : \periph ...
+        # remapped 2.0 books
+        # \intro, \conc, \glo, \idx : \id ...
+        for pattern, replacement in _RELAXED_REMAPS:
+            osis = pattern.sub(replacement, osis)
 
         return osis
 
@@ -118,51 +601,34 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         """
         # \id_<CODE>_(Name of file, Book name, Language, Last edited, Date,
         #             etc.)
-        osis = re.sub(r'\\id\s+([A-Z0-9]{3})\b\s*([^\\' + '\n]*?)\n' +
-                      r'(.*)(?=\\id|$)',
-                      lambda m: '\uFDD0<div type="book" osisID="' +
-                      BOOK_DICT[m.group(1)] + '">\n' +
-                      (('<!-- id comment - ' + m.group(2) + ' -->\n') if
-                       m.group(2) else '') + m.group(3) +
-                      '</div type="book">\uFDD0\n', osis, flags=re.DOTALL)
-
-        # \ide_<ENCODING>
-        # delete, since this was handled above
-        osis = re.sub(r'\\ide\b.*' + '\n', '', osis)
-        # \sts_<STATUS CODE>
-        osis = re.sub(r'\\sts\b\s+(.+)\s*' + '\n',
-                      r'<milestone type="x-usfm-sts" n="\1"/>' + '\n', osis)
-
-        # \rem_text...
-        osis = re.sub(r'\\rem\b\s+(.+)', r'<!-- rem - \1 -->', osis)
-
-        # \restore_text...
-        if relaxed_conformance:
-            osis = re.sub(r'\\restore\b\s+(.+)', r'<!-- restore - \1 -->',
-                          osis)
-
-        # \h#_text...
-        osis = re.sub(r'\\h\b\s+(.+)\s*' + '\n',
-                      r'<title type="runningHead">\1</title>' + '\n', osis)
-        osis = re.sub(r'\\h(\d)\b\s+(.+)\s*' + '\n',
-                      r'<title type="runningHead" n="\1">\2</title>' + '\n',
-                      osis)
+        def tag_book(matchObject):
+            """Regex helper function to tag books, returning a
+            <div>-encapsulated string.
 
-        # \toc1_text...
-        osis = re.sub(r'\\toc1\b\s+(.+)\s*' + '\n',
-                      r'<milestone type="x-usfm-toc1" n="\1"/>' + '\n', osis)
+            Keyword arguments:
+            matchObject -- a regex match object containing the book code,
+            the \id comment, and the book contents
+            """
+            code, comment, contents = matchObject.groups()
+            if comment:
+                return (_BOOK_OPENINGS[code] + '<!-- id comment - ' + comment +
+                        ' -->\n' + contents + '</div type="book">\uFDD0\n')
+            return (_BOOK_OPENINGS[code] + contents +
+                    '</div type="book">\uFDD0\n')
 
-        # \toc2_text...
-        osis = re.sub(r'\\toc2\b\s+(.+)\s*' + '\n',
-                      r'<milestone type="x-usfm-toc2" n="\1"/>' + '\n', osis)
+        osis = _RE_ID.sub(tag_book, osis)
 
-        # \toc3_text...
-        osis = re.sub(r'\\toc3\b\s+(.+)\s*' + '\n',
-                      r'<milestone type="x-usfm-toc3" n="\1"/>' + '\n', osis)
+        # \ide, \sts, \rem, \h, \h#, \toc1, \toc2, \toc3 (& \restore)
+        if relaxed_conformance:
+            identification_regex = _RE_IDENTIFICATION_RELAXED
+        else:
+            identification_regex = _RE_IDENTIFICATION
+        osis = identification_regex.sub(
+            lambda m: m.expand(_IDENTIFICATION_TEMPLATES[m.lastgroup]), osis)
 
         return osis
 
-    def cvt_introductions(osis, relaxed_conformance):
+    def cvt_introductions(osis, relaxed_conformance, present_tags):
         """Converts USFM **Introduction** tags to OSIS, returning the processed
         text as a string.
 
@@ -174,33 +640,37 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         osis -- The document as a string.
         relaxed_conformance -- Boolean value indicating whether to process
         non-standard & deprecated USFM tags.
+        present_tags -- The set of tag names (without digits) in the document
+        after the relaxed conformance remaps.
         """
+        # no pass ahead of this one produces any introduction tag, so the
+        # names found in the document say whether there is any work to do
+        if present_tags.isdisjoint(_INTRO_TAG_NAMES):
+            return osis
+
         # \imt#_text...
-        osis = re.sub(r'\\imt(\d?)\s+(.+)', lambda m: '<title ' +
-                      ('level="' + m.group(1) + '" ' if m.group(1) else '') +
-                      'type="main" subType="x-introduction">' + m.group(2) +
-                      '</title>', osis)
+        osis = _RE_IMT.sub(lambda m: '<title ' +
+                           ('level="' + m.group(1) + '" ' if m.group(1) else
+                            '') +
+                           'type="main" subType="x-introduction">' +
+                           m.group(2) + '</title>', osis)
 
         # \imte#_text...
-        osis = re.sub(r'\\imte(\d?)\b\s+(.+)', lambda m: '<title ' +
-                      ('level="' + m.group(1) + '" ' if m.group(1) else '') +
-                      'type="main" subType="x-introduction-end">' +
-                      m.group(2) + '</title>', osis)
+        osis = _RE_IMTE.sub(lambda m: '<title ' +
+                            ('level="' + m.group(1) + '" ' if m.group(1) else
+                             '') +
+                            'type="main" subType="x-introduction-end">' +
+                            m.group(2) + '</title>', osis)
 
         # \is#_text...
-        osis = re.sub(r'\\is1?\s+(.+)', lambda m: '\uFDE2<div type="section" subType="x-introduction"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDE2<div type="section" subType="x-introduction">[^\uFDE2]+)'+r'(?!\\c\b)', r'\1'+'</div>\uFDE2\n', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\is2\s+(.+)', lambda m: '\uFDE3<div type="subSection" subType="x-introduction"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDE3<div type="subSection" subType="x-introduction">[^\uFDE2\uFDE3]+)'+r'(?!\\c\b)', r'\1'+'</div>\uFDE3\n', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\is3\s+(.+)', lambda m: '\uFDE4<div type="x-subSubSection" subType="x-introduction"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDE4<div type="subSubSection" subType="x-introduction">[^\uFDE2\uFDE3\uFDE4]+)'+r'(?!\\c\b)', r'\1'+'</div>\uFDE4\n', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\is4\s+(.+)', lambda m: '\uFDE5<div type="x-subSubSubSection" subType="x-introduction"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDE5<div type="subSubSubSection" subType="x-introduction">[^\uFDE2\uFDE3\uFDE4\uFDE5]+)'+r'(?!\\c\b)', r'\1'+'</div>\uFDE5\n', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\is5\s+(.+)', lambda m: '\uFDE6<div type="x-subSubSubSubSection" subType="x-introduction"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDE6<div type="subSubSubSubSection" subType="x-introduction">[^\uFDE2\uFDE3\uFDE4\uFDE5\uFDE6]+?)'+r'(?!\\c\b)', r'\1'+'</div>\uFDE6\n', osis, flags=re.DOTALL)
+        osis = _RE_IS.sub(lambda m: _IS_OPENINGS[m.group(1)] + m.group(2) +
+                          '</title>', osis)
+        for sentinel, stoppers in _IS_LEVELS:
+            osis = _close_sections(osis, sentinel, stoppers)
 
         # \ip_text...
-        osis = re.sub(r'\\ip\s+(.*?)(?=(\\(i?m|i?p|lit|cls|tr|io|iq|i?li|iex?|s|c)\b|<(/?div|p|closer)\b))', lambda m: '\uFDD3<p subType="x-introduction">\n' + m.group(1) + '\uFDD3</p>\n', osis, flags=re.DOTALL)
+        osis = _RE_IP.sub('\uFDD3<p subType="x-introduction">\n' + r'\1' +
+                          '\uFDD3</p>\n', osis)
 
         # \ipi_text...
         # \im_text...
@@ -208,65 +678,42 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         # \ipq_text...
         # \imq_text...
         # \ipr_text...
-        p_type = {'ipi': 'x-indented', 'im': 'x-noindent',
-                  'imi': 'x-noindent-indented', 'ipq': 'x-quote',
-                  'imq': 'x-noindent-quote', 'ipr': 'x-right'}
-        osis = re.sub(r'\\(ipi|im|ipq|imq|ipr)\s+(.*?)(?=(\\(i?m|i?p|lit|cls|tr|io[t\d]?|ipi|iq|i?li|iex?|s|c)\b|<(/?div|p|closer)\b))', lambda m: '\uFDD3<p type="' + p_type[m.group(1)] + '" subType="x-introduction">\n' + m.group(2) + '\uFDD3</p>\n', osis, flags=re.DOTALL)
+        osis = _RE_IP_TYPED.sub(lambda m: '\uFDD3<p type="' + _IP_TYPES[m.group(1)] + '" subType="x-introduction">\n' + m.group(2) + '\uFDD3</p>\n', osis)
 
         # \iq#_text...
-        osis = re.sub(r'\\iq\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4' +
-                      r']|\\(iq\d?|fig|q\d?|b)\b|<title\b))',
-                      r'<l level="1" subType="x-introduction">\1</l>',
-                      osis, flags=re.DOTALL)
-        osis = re.sub(r'\\iq(\d)\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4' +
-                      r']|\\(iq\d?|fig|q\d?|b)\b|<title\b))',
-                      r'<l level="\1" subType="x-introduction">\2</l>',
-                      osis, flags=re.DOTALL)
+        osis = _RE_IQ.sub(r'<l level="1" subType="x-introduction">\1</l>',
+                          osis)
+        osis = _RE_IQ_NUM.sub(r'<l level="\1" subType="x-introduction">\2</l>',
+                              osis)
 
         # \ib
-        osis = re.sub(r'\\ib\b\s?', '<lb type="x-p"/>', osis)
+        osis = _RE_IB.sub('<lb type="x-p"/>', osis)
         osis = osis.replace('\n</l>', '</l>\n')
         # osis = re.sub('(<l [^\uFDD0\uFDD1\uFDD3\uFDD4]+</l>)', r'<lg>\1</lg>', osis, flags=re.DOTALL)
         # osis = re.sub('(<lg>.+?</lg>)', lambda m: m.group(1).replace('<lb type="x-p"/>', '</lg><lg>'), osis, flags=re.DOTALL) # re-handle \b that occurs within <lg>
 
         # \ili#_text...
-        osis = re.sub(r'\\ili\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4' + r']|\\(ili\d?|c|p|io[t\d]?|iex?)\b|<(lb|title|item|\?div)\b))', '<item type="x-indent-1" subType="x-introduction">\uFDE0' + r'\1' + '\uFDE0</item>', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\ili(\d)\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4' + r']|\\(ili\d?|c|p|io[t\d]?|iex?)\b|<(lb|title|item|\?div)\b))', r'<item type="x-indent-\1" subType="x-introduction">'+'\uFDE0' + r'\2' + '\uFDE0</item>', osis, flags=re.DOTALL)
-        osis = osis.replace('\n</item>', '</item>\n')
-        osis = re.sub('(<item [^\uFDD0\uFDD1\uFDD3\uFDD4]+</item>)',
-                      '\uFDD3<list>' + r'\1' + '</list>\uFDD3',
-                      osis, flags=re.DOTALL)
+        osis = _RE_ILI.sub('<item type="x-indent-1" subType="x-introduction">\uFDE0' + r'\1' + '\uFDE0</item>', osis)
+        osis = _RE_ILI_NUM.sub(r'<item type="x-indent-\1" subType="x-introduction">' + '\uFDE0' + r'\2' + '\uFDE0</item>', osis)
+        osis = _RE_INTRO_LIST.sub('\uFDD3<list>' + r'\1' + '</list>\uFDD3',
+                                  osis)
 
         # \iot_text...
         # \io#_text...(references range)
-        osis = re.sub(r'\\io\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4' + r']|\\(io[t\d]?|iex?|c|p)\b|<(lb|title|item|\?div)\b))', '<item type="x-indent-1" subType="x-introduction">\uFDE1' + r'\1' + '\uFDE1</item>', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\io(\d)\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4' + r']|\\(io[t\d]?|iex?|c|p)\b|<(lb|title|item|\?div)\b))', r'<item type="x-indent-\1" subType="x-introduction">'+'\uFDE1' + r'\2' + '\uFDE1</item>', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\iot\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4' +
-                      r']|\\(io[t\d]?|iex?|c|p)\b|<(lb|title|item|\?div)\b))',
-                      '<item type="head">\uFDE1' + r'\1' +
-                      '\uFDE1</item type="head">', osis, flags=re.DOTALL)
-        osis = osis.replace('\n</item>', '</item>\n')
-        osis = re.sub('(<item [^\uFDD0\uFDD1\uFDD3\uFDD4\uFDE0]+</item>)',
-                      '\uFDD3<div type="outline"><list>' + r'\1' +
-                      '</list></div>\uFDD3', osis, flags=re.DOTALL)
-        osis = re.sub('item type="head"', 'head', osis)
+        osis = _RE_IO.sub('<item type="x-indent-1" subType="x-introduction">\uFDE1' + r'\1' + '\uFDE1</item>', osis)
+        osis = _RE_IO_NUM.sub(r'<item type="x-indent-\1" subType="x-introduction">' + '\uFDE1' + r'\2' + '\uFDE1</item>', osis)
+        osis = _RE_IOT.sub('<item type="head">\uFDE1' + r'\1' +
+                           '\uFDE1</item type="head">', osis)
+        osis = _RE_INTRO_OUTLINE.sub('\uFDD3<div type="outline"><list>' +
+                                     r'\1' + '</list></div>\uFDD3', osis)
+        osis = osis.replace('item type="head"', 'head')
 
         # \ior_text...\ior*
-        osis = re.sub(r'\\ior\b\s+(.+?)\\ior\*', r'<reference>\1</reference>',
-                      osis, flags=re.DOTALL)
-
-        # \iex  # TODO: look for example; I have no idea what this would look like in context
-        osis = re.sub(r'\\iex\b\s*(.+?)' +
-                      r'?=(\s*(\\c|</div type="book">'+'\uFDD0))',
-                      r'<div type="bridge">\1</div>', osis, flags=re.DOTALL)
-
+        # \iex
         # \iqt_text...\iqt*
-        osis = re.sub(r'\\iqt\s+(.+?)\\iqt\*',
-                      r'<q subType="x-introduction">\1</q>',
-                      osis, flags=re.DOTALL)
-
         # \ie
-        osis = re.sub(r'\\ie\b\s*', '<milestone type="x-usfm-ie"/>', osis)
+        for pattern, replacement in _INTRO_REMAPS:
+            osis = pattern.sub(replacement, osis)
 
         return osis
 
@@ -283,56 +730,37 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         non-standard & deprecated USFM tags.
         """
         # \ms#_text...
-        osis = re.sub(r'\\ms1?\s+(.+)', lambda m: '\uFDD5<div type="majorSection"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDD5[^\uFDD5\uFDD0]+)', r'\1' + '</div>\uFDD5\n', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\ms2\s+(.+)', lambda m: '\uFDD6<div type="majorSection" n="2"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDD6[^\uFDD5\uFDD0\uFDD6]+)', r'\1' + '</div>\uFDD6\n', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\ms3\s+(.+)', lambda m: '\uFDD7<div type="majorSection" n="3"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDD7[^\uFDD5\uFDD0\uFDD6\uFDD7]+)', r'\1' + '</div>\uFDD7\n', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\ms4\s+(.+)', lambda m: '\uFDD8<div type="majorSection" n="4"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDD8[^\uFDD5\uFDD0\uFDD6\uFDD7\uFDD8]+)', r'\1' + '</div>\uFDD8\n', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\ms5\s+(.+)', lambda m: '\uFDD9<div type="majorSection" n="5"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDD9[^\uFDD5\uFDD0\uFDD6\uFDD7\uFDD8\uFDD9]+)', r'\1' + '</div>\uFDD9\n', osis, flags=re.DOTALL)
+        osis = _RE_MS.sub(lambda m: _MS_OPENINGS[m.group(1)] + m.group(2) +
+                          '</title>', osis)
+        for sentinel, stoppers in _MS_LEVELS:
+            osis = _close_sections(osis, sentinel, stoppers)
 
         # \mr_text...
-        osis = re.sub(r'\\mr\s+(.+)', '\uFDD4<title type="scope"><reference>' + r'\1</reference></title>', osis)
+        osis = _RE_MR.sub('\uFDD4<title type="scope"><reference>' + r'\1</reference></title>', osis)
 
         # \s#_text...
-        osis = re.sub(r'\\s1?\s+(.+)', lambda m: '\uFDDA<div type="section"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDDA<div type="section">[^\uFDD5\uFDD0\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA]+)', r'\1' + '</div>\uFDDA\n', osis, flags=re.DOTALL)
         if relaxed_conformance:
-            osis = re.sub(r'\\ss\s+', r'\\s2 ', osis)
-            osis = re.sub(r'\\sss\s+', r'\\s3 ', osis)
-        osis = re.sub(r'\\s2\s+(.+)', lambda m: '\uFDDB<div type="subSection"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDDB<div type="subSection">[^\uFDD5\uFDD0\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA\uFDDB]+)', r'\1' + '</div>\uFDDB\n', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\s3\s+(.+)', lambda m: '\uFDDC<div type="x-subSubSection"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDDC<div type="x-subSubSection">[^\uFDD5\uFDD0\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA\uFDDB\uFDDC]+)', r'\1' + '</div>\uFDDC\n', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\s4\s+(.+)', lambda m: '\uFDDD<div type="x-subSubSubSection"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDDD<div type="x-subSubSubSection">[^\uFDD5\uFDD0\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA\uFDDB\uFDDC\uFDDD]+)', r'\1' + '</div>\uFDDD\n', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\s5\s+(.+)', lambda m: '\uFDDE<div type="x-subSubSubSubSection"><title>' + m.group(1) + '</title>', osis)
-        osis = re.sub('(\uFDDE<div type="x-subSubSubSubSection">[^\uFDD5\uFDD0\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA\uFDDB\uFDDC\uFDDD\uFDDE]+)', r'\1' + '</div>\uFDDE\n', osis, flags=re.DOTALL)
+            osis = _RE_SS.sub(r'\\s2 ', osis)
+            osis = _RE_SSS.sub(r'\\s3 ', osis)
+        osis = _RE_S.sub(lambda m: _S_OPENINGS[m.group(1)] + m.group(2) +
+                         '</title>', osis)
+        for sentinel, stoppers in _S_LEVELS:
+            osis = _close_sections(osis, sentinel, stoppers)
 
         # \sr_text...
-        osis = re.sub(r'\\sr\s+(.+)', '\uFDD4<title type="scope"><reference>' + r'\1</reference></title>', osis)
         # \r_text...
-        osis = re.sub(r'\\r\s+(.+)', '\uFDD4<title type="parallel"><reference type="parallel">' + r'\1</reference></title>', osis)
         # \rq_text...\rq*
-        osis = re.sub(r'\\rq\s+(.+?)\\rq\*', r'<reference type="source">\1</reference>', osis, flags=re.DOTALL)
-
         # \d_text...
-        osis = re.sub(r'\\d\s+(.+)', '\uFDD4<title canonical="true" type="psalm">' + r'\1</title>', osis)
-
         # \sp_text...
-        osis = re.sub(r'\\sp\s+(.+)', r'<speaker>\1</speaker>', osis)
+        for pattern, replacement in _HEADING_REMAPS:
+            osis = pattern.sub(replacement, osis)
 
         # \mt#_text...
-        osis = re.sub(r'\\mt(\d?)\s+(.+)',
-                      lambda m: '<title ' + ('level="' + m.group(1) + '" ' if m.group(1) else '') + 'type="main">' + m.group(2) + '</title>',
-                      osis)
+        osis = _RE_MT.sub(lambda m: '<title ' + ('level="' + m.group(1) + '" ' if m.group(1) else '') + 'type="main">' + m.group(2) + '</title>',
+                          osis)
         # \mte#_text...
-        osis = re.sub(r'\\mte(\d?)\s+(.+)',
-                      lambda m: '<title ' + ('level="' + m.group(1) + '" ' if m.group(1) else '') + 'type="main" subType="x-end">' + m.group(2) + '</title>',
-                      osis)
+        osis = _RE_MTE.sub(lambda m: '<title ' + ('level="' + m.group(1) + '" ' if m.group(1) else '') + 'type="main" subType="x-end">' + m.group(2) + '</title>',
+                           osis)
 
         return osis
 
@@ -348,83 +776,106 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         relaxed_conformance -- Boolean value indicating whether to process
         non-standard & deprecated USFM tags.
         """
-        # \c_#
-        osis = re.sub(r'\\c\s+([^\s]+)\b(.+?)(?=(\\c\s+|</div type="book"))',
-                      lambda m: '\uFDD1<chapter osisID="$BOOK$.' + m.group(1) +
-                      r'" sID="$BOOK$.' + m.group(1) + '"/>' + m.group(2) +
-                      '<chapter eID="$BOOK$.' + m.group(1) + '"/>\uFDD3\n',
-                      osis, flags=re.DOTALL)
-
         # \cp_#
         # \ca_#\ca*
-        def replace_chapter_number(matchObject):
-            """Regex helper function to replace chapter numbers from \c_# with
+        def replace_chapter_number(ctext):
+            """Helper function to replace chapter numbers from \c_# with
             values that appeared in \cp_# and \ca_#\ca*, returing the chapter
             text as a string.
 
             Keyword arguments:
-            matchObject -- a regex match object in which the first element is
-            the chapter text
+            ctext -- the chapter text
             """
-            ctext = matchObject.group(1)
-            cp = re.search(r'\\cp\s+(.+?)(?=(\\|\s))', ctext)
+            # most chapters have neither tag, so don't run the regexes
+            if '\\cp' not in ctext and '\\ca' not in ctext:
+                return ctext
+            # the values come from the document, so they go into the osisIDs
+            # through functions rather than as replacement templates
+            ctext, cp = _remove_tag(_RE_CP_VALUE, _RE_CP, ctext)
             if cp:
-                ctext = re.sub(r'\\cp\s+(.+?)(?=(\\|\s))', '', ctext,
-                               flags=re.DOTALL)
-                cp = cp.group(1)
-                ctext = re.sub(r'"\$BOOK\$\.([^"\.]+)"', '"$BOOK$.'+cp+'"',
-                               ctext)
-            ca = re.search(r'\\ca\s+(.+?)\\ca\*', ctext)
+                ctext = _RE_CP_ID.sub(lambda m: '"$BOOK$.' + cp + '"', ctext)
+            ctext, ca = _remove_tag(_RE_CA_VALUE, _RE_CA, ctext)
             if ca:
-                ctext = re.sub(r'\\ca\s+(.+?)\\ca\*', '',
-                               ctext, flags=re.DOTALL)
-                ca = ca.group(1)
-                ctext = re.sub(r'(osisID="\$BOOK\$\.[^"\.]+)"',
-                               r'\1 $BOOK$.' + ca + '"', ctext)
+                ctext = _RE_CA_ID.sub(lambda m: m.group(1) + ' $BOOK$.' + ca +
+                                      '"', ctext)
             return ctext
-        osis = re.sub(r'(<chapter [^<]+sID[^<]+/>.+?<chapter eID[^>]+/>)',
-                      replace_chapter_number, osis, flags=re.DOTALL)
+
+        # \c_#
+        osis = _RE_C.sub(lambda m: replace_chapter_number(
+            '\uFDD1<chapter osisID="$BOOK$.' + m.group(1) + r'" sID="$BOOK$.' +
+            m.group(1) + '"/>' + m.group(2) + '<chapter eID="$BOOK$.' +
+            m.group(1) + '"/>\uFDD3\n'), osis)
 
         # \cl_
-        osis = re.sub(r'\\cl\s+(.+)', '\uFDD4<title>' + r'\1</title>', osis)
+        osis = _RE_CL.sub('\uFDD4<title>' + r'\1</title>', osis)
 
         # \cd_#   <--This # seems to be an error
-        osis = re.sub(r'\\cd\b\s+(.+)', '\uFDD4<title type="x-description">' +
-                      r'\1</title>', osis)
+        osis = _RE_CD.sub('\uFDD4<title type="x-description">' + r'\1</title>',
+                          osis)
 
-        # \v_#
-        osis = re.sub(r'\\v\s+([^\s]+)\b\s*(.+?)(?=(\\v\s+|</div type="book"|<chapter eID))', lambda m: '\uFDD2<verse osisID="$BOOK$.$CHAP$.' + m.group(1) + '" sID="$BOOK$.$CHAP$.' + m.group(1) + '"/>' + m.group(2) + '<verse eID="$BOOK$.$CHAP$.' + m.group(1) + '"/>\uFDD2\n', osis, flags=re.DOTALL)
+        # TODO: add support for subverses, including in ranges/series,
+        #       e.g. Matt.1.1!b-Matt.2.5,Matt.2.7!a
+
+        # TODO: make sure that descending ranges generate invalid markup
+        #       (osisID="") expand verse ranges, series
+        def expand_range(v_range):
+            """Expands a verse range into its constituent verses as a string.
+
+            Keyword arguments:
+            vRange -- A string of the lower & upper bounds of the range, with a
+            hypen in between.
+            """
+            (low, high) = v_range.split('-')
+            return ' '.join(['$BOOK$.$CHAP$.' + str(n) for n in
+                             _range(int(low), int(high) + 1)])
+
+        def expand_series(v_series):
+            """Expands a verse series (list) into its constituent verses as a
+            string.
+
+            Keyword arguments:
+            vSeries -- A comma-separated list of verses.
+            """
+            return ' '.join(['$BOOK$.$CHAP$.' + n for n in
+                             v_series.split(',')])
 
         # \vp_#\vp*
         # \va_#\va*
-        def replace_verse_number(matchObject):
-            """Regex helper function to replace verse numbers from \v_# with
-            values that appeared in \vp_#\vp* and \va_#\va*, returing the verse
-            text as a string.
+        def replace_verse_number(vnum, vtext):
+            """Helper function to replace verse numbers from \v_# with
+            values that appeared in \vp_#\vp* and \va_#\va*, and to expand
+            verse ranges & series in the osisIDs, returing the verse text as a
+            string.
 
             Keyword arguments:
-            matchObject -- a regex match object in which the first element is
-            the verse text
+            vnum -- the verse number from \v_#
+            vtext -- the verse text
             """
-            vtext = matchObject.group(1)
-            vp = re.search(r'\\vp\s+(.+?)\\vp\*', vtext)
-            if vp:
-                vtext = re.sub(r'\\vp\s+(.+?)\\vp\*', '', vtext,
-                               flags=re.DOTALL)
-                vp = vp.group(1)
-                vtext = re.sub(r'"\$BOOK\$\.\$CHAP\$\.([^"\.]+)"',
-                               '"$BOOK$.$CHAP$.' + vp + '"', vtext)
-            va = re.search(r'\\va\s+(.+?)\\va\*', vtext)
-            if va:
-                vtext = re.sub(r'\\va\s+(.+?)\\va\*', '', vtext,
-                               flags=re.DOTALL)
-                va = va.group(1)
-                vtext = re.sub(r'(osisID="\$BOOK\$\.\$CHAP\$\.[^"\.]+)"',
-                               r'\1 $BOOK$.$CHAP$.' + va + '"', vtext)
+            expand = '-' in vnum or ',' in vnum
+            # most verses have neither tag, so don't run the regexes
+            if '\\vp' in vtext or '\\va' in vtext:
+                # as for \cp and \ca, the values aren't used as templates
+                vtext, vp = _remove_tag(_RE_VP_VALUE, _RE_VP, vtext)
+                if vp:
+                    vtext = _RE_VP_ID.sub(
+                        lambda m: '"$BOOK$.$CHAP$.' + vp + '"', vtext)
+                vtext, va = _remove_tag(_RE_VA_VALUE, _RE_VA, vtext)
+                if va:
+                    vtext = _RE_VA_ID.sub(
+                        lambda m: m.group(1) + ' $BOOK$.$CHAP$.' + va + '"',
+                        vtext)
+                expand = True
+            # expanding here, where only the few verses with a range or series
+            # are scanned, spares process_osisIDs two whole-document passes
+            if expand:
+                vtext = _RE_VERSE_RANGE_ID.sub(
+                    lambda m: expand_range(m.group(1))+'"', vtext)
+                vtext = _RE_VERSE_SERIES_ID.sub(
+                    lambda m: expand_series(m.group(1))+'"', vtext)
             return vtext
 
-        osis = re.sub(r'(<verse [^<]+sID[^<]+/>.+?<verse eID[^>]+/>)',
-                      replace_verse_number, osis, flags=re.DOTALL)
+        # \v_#
+        osis = _RE_V.sub(lambda m: replace_verse_number(m.group(1), '\uFDD2<verse osisID="$BOOK$.$CHAP$.' + m.group(1) + '" sID="$BOOK$.$CHAP$.' + m.group(1) + '"/>' + m.group(2) + '<verse eID="$BOOK$.$CHAP$.' + m.group(1) + '"/>\uFDD2\n'), osis)
 
         return osis
 
@@ -440,15 +891,15 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         relaxed_conformance -- Boolean value indicating whether to process
         non-standard & deprecated USFM tags.
         """
-        paragraphregex = 'pc|pr|m|pmo|pm|pmc|pmr|pi|pi1|pi2|pi3|pi4|pi5|mi|nb'
         if relaxed_conformance:
-            paragraphregex += '|phi|ps|psi|p1|p2|p3|p4|p5'
+            p_regex = _RE_P_RELAXED
+            p_typed_regex = _RE_P_TYPED_RELAXED
+        else:
+            p_regex = _RE_P
+            p_typed_regex = _RE_P_TYPED
 
         # \p(_text...)
-        osis = re.sub(r'\\p\s+(.*?)(?=(\\(i?m|i?p|lit|cls|tr|p|' +
-                      paragraphregex+r')\b|<chapter eID|<(/?div|p|closer)\b))',
-                      lambda m: '\uFDD3<p>\n' + m.group(1) + '\uFDD3</p>\n',
-                      osis, flags=re.DOTALL)
+        osis = p_regex.sub('\uFDD3<p>\n' + r'\1' + '\uFDD3</p>\n', osis)
 
         # \pc(_text...)
         # \pr(_text...)
@@ -464,38 +915,23 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         # \ps # deprecated
         # \psi # deprecated
         # \p# # deprecated
-        p_type = {'pc': 'x-center', 'pr': 'x-right', 'm': 'x-noindent',
-                  'pmo': 'x-embedded-opening', 'pm': 'x-embedded',
-                  'pmc': 'x-embedded-closing', 'pmr': 'x-right',
-                  'pi': 'x-indented-1', 'pi1': 'x-indented-1',
-                  'pi2': 'x-indented-2', 'pi3': 'x-indented-3',
-                  'pi4': 'x-indented-4', 'pi5': 'x-indented-5',
-                  'mi': 'x-noindent-indented', 'nb': 'x-nobreak',
-                  'phi': 'x-indented-hanging', 'ps': 'x-nobreakNext',
-                  'psi': 'x-nobreakNext-indented', 'p1': 'x-level-1',
-                  'p2': 'x-level-2', 'p3': 'x-level-3', 'p4': 'x-level-4',
-                  'p5': 'x-level-5'}
-        osis = re.sub(r'\\(' + paragraphregex +
-                      r')\s+(.*?)(?=(\\(i?m|i?p|lit|cls|tr|' + paragraphregex +
-                      r')\b|<chapter eID|<(/?div|p|closer)\b))',
-                      lambda m: '\uFDD3<p type="' + p_type[m.group(1)] +
-                      '">\n' + m.group(2) + '\uFDD3</p>\n',
-                      osis, flags=re.DOTALL)
+        osis = p_typed_regex.sub(lambda m: '\uFDD3<p type="' +
+                                 _P_TYPES[m.group(1)] + '">\n' + m.group(2) +
+                                 '\uFDD3</p>\n', osis)
 
         # \cls_text...
-        osis = re.sub(r'\\m\s+(.+?)(?=(\\(i?m|i?p|lit|cls|tr)\b|<chapter eID|<(/?div|p|closer)\b))', lambda m: '\uFDD3<closer>' + m.group(1) + '\uFDD3</closer>\n', osis, flags=re.DOTALL)
+        osis = _RE_CLS.sub('\uFDD3<closer>' + r'\1' + '\uFDD3</closer>\n', osis)
 
         # \ph#(_text...)
         # \li#(_text...)
-        osis = re.sub(r'\\ph\b\s*', r'\\li ', osis)
-        osis = re.sub(r'\\ph(\d)\b\s*', r'\\li\1 ', osis)
-        osis = re.sub(r'\\li\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4\uFDE0\uFDE1\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA\uFDDB\uFDDC\uFDDD\uFDDE' + r']|\\li\d?\b|<(lb|title|item|/?div|/?chapter)\b))', r'<item type="x-indent-1">\1</item>', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\li(\d)\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4\uFDE0\uFDE1\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA\uFDDB\uFDDC\uFDDD\uFDDE' + r']|\\li\d?\b|<(lb|title|item|/?div|/?chapter)\b))', r'<item type="x-indent-\1">\2</item>', osis, flags=re.DOTALL)
-        osis = osis.replace('\n</item>', '</item>\n')
-        osis = re.sub('(<item [^\uFDD0\uFDD1\uFDD3\uFDD4\uFDE0\uFDE1\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA\uFDDB\uFDDC\uFDDD\uFDDE]+</item>)', '\uFDD3<list>' + r'\1' + '</list>\uFDD3', osis, flags=re.DOTALL)
+        osis = _RE_PH.sub(r'\\li ', osis)
+        osis = _RE_PH_NUM.sub(r'\\li\1 ', osis)
+        osis = _RE_LI.sub(r'<item type="x-indent-1">\1</item>\2', osis)
+        osis = _RE_LI_NUM.sub(r'<item type="x-indent-\1">\2</item>\3', osis)
+        osis = _RE_LIST.sub('\uFDD3<list>' + r'\1' + '</list>\uFDD3', osis)
 
         # \b
-        osis = re.sub(r'\\b\b\s?', '<lb type="x-p"/>', osis)
+        osis = _RE_B.sub('<lb type="x-p"/>', osis)
 
         return osis
 
@@ -512,39 +948,32 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         """
 
         # \qa_text...
-        osis = re.sub(r'\\qa\s+(.+)', '\uFDD4<title type="acrostic">' +
-                      r'\1</title>', osis)
+        osis = _RE_QA.sub('\uFDD4<title type="acrostic">' + r'\1</title>', osis)
 
         # \qac_text...\qac*
-        osis = re.sub(r'\\qac\s+(.+?)\\qac\*', r'<hi type="acrostic">\1</hi>',
-                      osis, flags=re.DOTALL)
+        osis = _RE_QAC.sub(r'<hi type="acrostic">\1</hi>', osis)
 
         # \qs_(Selah)\qs*
-        osis = re.sub(r'\\qs\b\s(.+?)\\qs\*', r'<l type="selah">\1</l>',
-                      osis, flags=re.DOTALL)
+        osis = _RE_QS.sub(r'<l type="selah">\1</l>', osis)
 
         # \q#(_text...)
-        osis = re.sub(r'\\q\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA\uFDDB\uFDDC\uFDDD\uFDDE' + r']|\\(q\d?|fig)\b|<(l|lb|title|list|/?div)\b))', r'<l level="1">\1</l>', osis, flags=re.DOTALL)
-        osis = re.sub(r'\\q(\d)\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA\uFDDB\uFDDC\uFDDD\uFDDE' + r']|\\(q\d?|fig)\b|<(l|lb|title|list|/?div)\b))', r'<l level="\1">\2</l>', osis, flags=re.DOTALL)
+        osis = _RE_Q.sub(r'<l level="1">\1</l>', osis)
+        osis = _RE_Q_NUM.sub(r'<l level="\1">\2</l>', osis)
 
         # \qr_text...
         # \qc_text...
         # \qm#(_text...)
-        qType = {'qr': 'x-right', 'qc': 'x-center',
-                 'qm': 'x-embedded" level="1', 'qm1': 'x-embedded" level="1',
-                 'qm2': 'x-embedded" level="2', 'qm3': 'x-embedded" level="3',
-                 'qm4': 'x-embedded" level="4', 'qm5': 'x-embedded" level="5'}
-        osis = re.sub(r'\\(qr|qc|qm\d)\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA\uFDDB\uFDDC\uFDDD\uFDDE' + r']|\\(q\d?|fig)\b|<(l|lb|title|list|/?div)\b))', lambda m: '<l type="' + qType[m.group(1)] + '">' + m.group(2) + '</l>', osis, flags=re.DOTALL)
+        osis = _RE_Q_TYPED.sub(lambda m: '<l type="' + _Q_TYPES[m.group(1)] + '">' + m.group(2) + '</l>', osis)
 
         osis = osis.replace('\n</l>', '</l>\n')
-        osis = re.sub('(<l [^\uFDD0\uFDD1\uFDD3\uFDD4\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA\uFDDB\uFDDC\uFDDD\uFDDE]+</l>)', r'<lg>\1</lg>', osis, flags=re.DOTALL)
+        osis = _RE_LG.sub(r'<lg>\1</lg>', osis)
 
         # \b
-        osis = re.sub('(<lg>.+?</lg>)', lambda m: m.group(1).replace('<lb type="x-p"/>', '</lg><lg>'), osis, flags=re.DOTALL)  # re-handle \b that occurs within <lg>
+        osis = _RE_LG_BREAK.sub(lambda m: m.group(1).replace('<lb type="x-p"/>', '</lg><lg>'), osis)  # re-handle \b that occurs within <lg>
 
         return osis
 
-    def cvt_tables(osis, relaxed_conformance):
+    def cvt_tables(osis, relaxed_conformance, present_tags):
         """Converts USFM **Table** tags to OSIS, returning the processed text as
         a string.
 
@@ -554,28 +983,48 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         osis -- The document as a string.
         relaxed_conformance -- Boolean value indicating whether to process
         non-standard & deprecated USFM tags.
+        present_tags -- The set of tag names (without digits) in the document
+        after the relaxed conformance remaps.
         """
+        # no pass ahead of this one produces any \tr or cell tag (\tr#
+        # is remapped before the names are collected), so the names found
+        # in the document say whether there is any work to do
+        if present_tags.isdisjoint(_TABLE_TAG_NAMES):
+            return osis
+
         # \tr_
-        osis = re.sub(r'\\tr\b\s*(.*?)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4' +
-                      r']|\\tr\s|<(lb|title)\b))', r'<row>\1</row>',
-                      osis, flags=re.DOTALL)
+        osis = _RE_TR.sub(r'<row>\1</row>', osis)
 
         # \th#_text...
         # \thr#_text...
         # \tc#_text...
         # \tcr#_text...
-        t_type = {'th': ' role="label"', 'thr': ' role="label" type="x-right"',
-                  'tc': '', 'tcr': ' type="x-right"'}
-        osis = re.sub(r'\\(thr?|tcr?)\d*\b\s*(.*?)(?=(\\t[hc]|</row))',
-                      lambda m: '<cell' + t_type[m.group(1)] + '>' +
-                      m.group(2) + '</cell>', osis, flags=re.DOTALL)
+        osis = _RE_CELL.sub(lambda m: '<cell' + _CELL_TYPES[m.group(1)] + '>' +
+                            m.group(2) + '</cell>', osis)
 
-        osis = re.sub(r'(<row>.*?</row>)(?=([' + '\uFDD0\uFDD1\uFDD3\uFDD4' +
-                      r']|\\tr\s|<(lb|title)\b))', r'<table>\1</table>',
-                      osis, flags=re.DOTALL)
+        osis = _RE_TABLE.sub(r'<table>\1</table>', osis)
 
         return osis
 
+    def make_note(caller, attributes, contents):
+        """Build an OSIS note around note contents that still need their
+        note-internal tags converted, returning the note as a string.
+
+        Keyword arguments:
+        caller -- The USFM note caller: + for an automatic caller, - for none,
+        or the caller itself.
+        attributes -- The attributes of the note element as a string.
+        contents -- The contents of the note as a string.
+        """
+        if caller == '-':
+            n = ' n=""'
+        elif caller == '+':
+            n = ''
+        else:
+            n = ' n="' + caller + '"'
+        return ('<note' + n + ' ' + attributes + '>' + contents +
+                '\uFDDF</note>')
+
     def process_note(note):
         """Convert note-internal USFM tags to OSIS, returning the note as a
         string.
@@ -584,46 +1033,55 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         note -- The note as a string.
         """
         note = note.replace('\n', ' ')
+        # a note without note-internal tags or an earlier \fp only needs its
+        # markers removed
+        if '\\f' not in note and '<p>' not in note:
+            return note.replace('\uFDDF', '')
 
         # \fdc_refs...\fdc*
-        note = re.sub(r'\\fdc\b\s(.+?)\\fdc\b\*',
-                      r'<seg editions="dc">\1</seg>', note)
+        note = _RE_FDC.sub(r'<seg editions="dc">\1</seg>', note)
 
-        # \fq_
-        note = re.sub(r'\\fq\b\s(.+?)(?=(\\f|' + '\uFDDF))',
-                      '\uFDDF' + r'<catchWord>\1</catchWord>', note)
+        def tag_field(matchObject):
+            """Regex helper function to convert a note field, returning the
+            OSIS element as a string preceded by a marker that ends the fields
+            converted after it.
 
+            Keyword arguments:
+            matchObject -- a regex match object in which the first element is
+            the tag name without its leading f and the second is the field
+            text
+            """
+            (open_tag, close_tag) = _NOTE_FIELDS['f' + matchObject.group(1)]
+            return '\uFDDF' + open_tag + matchObject.group(2) + close_tag
+
+        # \fq_
         # \fqa_
-        note = re.sub(r'\\fqa\b\s(.+?)(?=(\\f|' + '\uFDDF))',
-                      '\uFDDF' + r'<rdg type="alternate">\1</rdg>', note)
+        note = _RE_FQ_FQA.sub(tag_field, note)
 
         # \ft_
-        note = re.sub(r'\\ft\s', '', note)
+        if '\\ft' in note:
+            note = _RE_FT.sub('', note)
 
         # \fr_##SEP##
-        note = re.sub(r'\\fr\b\s(.+?)(?=(\\f|' + '\uFDDF))',
-                      '\uFDDF' + r'<reference type="annotateRef">\1</reference>',
-                      note)
-
         # \fk_
-        note = re.sub(r'\\fk\b\s(.+?)(?=(\\f|' + '\uFDDF))',
-                      '\uFDDF' + r'<catchWord>\1</catchWord>', note)
-
         # \fl_
-        note = re.sub(r'\\fl\b\s(.+?)(?=(\\f|' + '\uFDDF))',
-                      '\uFDDF' + r'<label>\1</label>', note)
+        note = _RE_FR_FK_FL.sub(tag_field, note)
 
         # \fp_
-        note = re.sub(r'\\fp\b\s(.+?)(?=(\\fp|$))', r'<p>\1</p>', note)
-        note = re.sub(r'(<note\b[^>]*?>)(.*?)<p>', r'\1<p>\2</p><p>', note)
+        if '\\fp' in note:
+            note = _RE_FP.sub(r'<p>\1</p>', note)
+        if '<p>' in note:
+            note = _RE_FP_LEAD.sub(r'\1<p>\2</p><p>', note)
 
         # \fv_
-        note = re.sub(r'\\fv\b\s(.+?)(?=(\\f|' + '\uFDDF))',
-                      '\uFDDF' + r'<hi type="super">\1</hi>', note)
+        note = _RE_FV.sub('\uFDDF' + r'<hi type="super">\1</hi>', note)
 
         # \fq*,\fqa*,\ft*,\fr*,\fk*,\fl*,\fp*,\fv*
-        note = re.sub(r'\\f(q|qa|t|r|k|l|p|v)\*', '', note)
+        if '\\f' in note:
+            note = _RE_NOTE_CLOSERS.sub('', note)
 
+        # the markers have to go here rather than in the final cleanup: the
+        # study content pass runs the converted notes through here again
         note = note.replace('\uFDDF', '')
         return note
 
@@ -639,30 +1097,22 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         relaxed_conformance -- Boolean value indicating whether to process
         non-standard & deprecated USFM tags.
         """
+        # every tag handled here starts with \f
+        if '\\f' not in osis:
+            return osis
+
         # \f_+_...\f*
-        osis = re.sub(r'\\f\s+([^\s\\]+)?\s*(.+?)\s*\\f\*',
-                      lambda m: '<note' + ((' n=""') if
-                                           (m.group(1) == '-') else
-                                           ('' if (m.group(1) == '+') else
-                                            (' n="' + m.group(1) + '"'))) +
-                      ' placement="foot">' + m.group(2) + '\uFDDF</note>',
-                      osis, flags=re.DOTALL)
+        osis = _RE_F.sub(lambda m: make_note(m.group(1), 'placement="foot"',
+                                             m.group(2)), osis)
 
         # \fe_+_...\fe*
-        osis = re.sub(r'\\fe\s+([^\s\\]+?)\s*(.+?)\s*\\fe\*',
-                      lambda m: '<note' + ((' n=""') if
-                                           (m.group(1) == '-') else
-                                           ('' if (m.group(1) == '+') else
-                                            (' n="' + m.group(1) + '"'))) +
-                      ' placement="end">' + m.group(2) + '\uFDDF</note>',
-                      osis, flags=re.DOTALL)
+        osis = _RE_FE.sub(lambda m: make_note(m.group(1), 'placement="end"',
+                                              m.group(2)), osis)
 
-        osis = re.sub(r'(<note\b[^>]*?>.*?</note>)',
-                      lambda m: process_note(m.group(1)), osis, flags=re.DOTALL)
+        osis = _RE_NOTE.sub(lambda m: process_note(m.group(1)), osis)
 
         # \fm_...\fm*
-        osis = re.sub(r'\\fm\b\s(.+?)\\fm\*', r'<hi type="super">\1</hi>',
-                      osis)
+        osis = _RE_FM.sub(r'<hi type="super">\1</hi>', osis)
 
         return osis
 
@@ -674,51 +1124,61 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         note -- The cross-reference note as a string.
         """
         note = note.replace('\n', ' ')
+        # a note without cross reference tags (like one converted already)
+        # only needs its markers removed
+        if '\\x' not in note:
+            return note.replace('\uFDDF', '')
 
         # \xot_refs...\xot*
-        note = re.sub(r'\\xot\b\s(.+?)\\xot\b\*',
-                      '\uFDDF' + r'<seg editions="ot">\1</seg>', note)
-
         # \xnt_refs...\xnt*
-        note = re.sub(r'\\xnt\b\s(.+?)\\xnt\b\*',
-                      '\uFDDF' + r'<seg editions="nt">\1</seg>', note)
-
         # \xdc_refs...\xdc*
-        note = re.sub(r'\\xdc\b\s(.+?)\\xdc\b\*',
-                      '\uFDDF' + r'<seg editions="dc">\1</seg>', note)
+        def tag_editions(matchObject):
+            """Regex helper function to convert \\xot, \\xnt and \\xdc,
+            returning the OSIS <seg/> as a string. References for other
+            editions nested within are converted too, as they were when each
+            edition had a pass of its own.
 
-        # \xq_
-        note = re.sub(r'\\xq\b\s(.+?)(?=(\\x|' + '\uFDDF))',
-                      '\uFDDF' + r'<catchWord>\1</catchWord>', note)
+            Keyword arguments:
+            matchObject -- a regex match object in which the first element is
+            the edition and the second is the references
+            """
+            refs = _RE_XREF_EDITIONS.sub(tag_editions, matchObject.group(2))
+            return ('\uFDDF<seg editions="' + matchObject.group(1) + '">' +
+                    refs + '</seg>')
+        note = _RE_XREF_EDITIONS.sub(tag_editions, note)
 
+        # \xq_
         # \xo_##SEP##
-        note = re.sub(r'\\xo\b\s(.+?)(?=(\\x|' + '\uFDDF))',
-                      '\uFDDF' + r'<reference type="annotateRef">\1</reference>', note)
-
         # \xk_
-        note = re.sub(r'\\xk\b\s(.+?)(?=(\\x|' + '\uFDDF))',
-                      '\uFDDF' + r'<catchWord>\1</catchWord>', note)
-
         # \xt_  # This isn't guaranteed to be *the* reference, but it's a good guess.
-        note = re.sub(r'\\xt\b\s(.+?)(?=(\\x|' + '\uFDDF))',
-                      '\uFDDF' + r'<reference>\1</reference>', note)
+        def tag_field(matchObject):
+            """Regex helper function to convert a cross reference field,
+            returning the OSIS element as a string preceded by a marker that
+            ends the field before it.
+
+            Keyword arguments:
+            matchObject -- a regex match object in which the first element is
+            the tag name without its leading x and the second is the field
+            text
+            """
+            (open_tag, close_tag) = _XREF_FIELDS[matchObject.group(1)]
+            return '\uFDDF' + open_tag + matchObject.group(2) + close_tag
+        note = _RE_XREF_FIELDS.sub(tag_field, note)
 
         if relaxed_conformance:
             # TODO: move this to a concorance/index-specific section?
             # \xtSee..\xtSee*: Concordance and Names Index markup for an
             #                  alternate entry target reference.
-            note = re.sub(r'\\xtSee\b\s(.+?)\\xtSee\b\*',
-                          '\uFDDF' +
-                          r'<reference osisRef="\1">See: \1</reference>', note)
             # \xtSeeAlso...\xtSeeAlso: Concordance and Names Index markup for
             #                          an additional entry target reference.
-            note = re.sub(r'\\xtSeeAlso\b\s(.+?)\\xtSeeAlso\b\*',
-                          '\uFDDF' +
-                          r'<reference osisRef="\1">See also: \1</reference>',
-                          note)
+            note = _RE_XREF_SEE.sub(lambda m: '\uFDDF<reference osisRef="' +
+                                    m.group(2) + '">' +
+                                    _XREF_SEE[m.group(1)] + m.group(2) +
+                                    '</reference>', note)
 
         # \xq*,\xt*,\xo*,\xk*
-        note = re.sub(r'\\x(q|t|o|k)\*', '', note)
+        if '\\x' in note:
+            note = _RE_XREF_CLOSERS.sub('', note)
 
         note = note.replace('\uFDDF', '')
         return note
@@ -735,22 +1195,21 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         relaxed_conformance -- Boolean value indicating whether to process
         non-standard & deprecated USFM tags.
         """
+        # every tag handled here starts with \x
+        if '\\x' not in osis:
+            return osis
+
         # \x_+_...\x*
-        osis = re.sub(r'\\x\s+([^\s]+?)\s+(.+?)\s*\\x\*',
-                      lambda m: '<note' + ((' n=""') if
-                                           (m.group(1) == '-') else
-                                           ('' if (m.group(1) == '+') else
-                                            (' n="' + m.group(1) + '"'))) +
-                      ' type="crossReference">' + m.group(2) + '\uFDDF</note>',
-                      osis, flags=re.DOTALL)
+        osis = _RE_X.sub(lambda m: make_note(m.group(1),
+                                             'type="crossReference"',
+                                             m.group(2)), osis)
 
-        osis = re.sub(r'(<note [^>]*?type="crossReference"[^>]*>.*?</note>)',
-                      lambda m: process_xref(m.group(1)), osis, flags=re.DOTALL)
+        osis = _RE_XREF_NOTE.sub(lambda m: process_xref(m.group(1)), osis)
 
         return osis
 
     # -- Special Text and Character Styles
-    def cvt_special_text(osis, relaxed_conformance):
+    def cvt_special_text(osis, relaxed_conformance, present_tags):
         """Converts USFM **Special Text** tags to OSIS, returning the processed
         text as a string.
 
@@ -762,97 +1221,74 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         osis -- The document as a string.
         relaxed_conformance -- Boolean value indicating whether to process
         non-standard & deprecated USFM tags.
+        present_tags -- The set of tag names (without digits) in the document
+        after the relaxed conformance remaps.
         """
-        # \add_...\add*
-        osis = re.sub(r'\\add\s+(.+?)\\add\*',
-                      r'<transChange type="added">\1</transChange>',
-                      osis, flags=re.DOTALL)
+        # no pass ahead of this one produces any special text tag, so the
+        # names found in the document say whether there is any work to do
+        if present_tags.isdisjoint(_SPECIAL_TEXT_TAG_NAMES):
+            return osis
 
+        # \add_...\add*
         # \wj_...\wj*
-        osis = re.sub(r'\\wj\s+(.+?)\\wj\*',
-                      r'<q who="Jesus" marker="">\1</q>',
-                      osis, flags=re.DOTALL)
-
         # \nd_...\nd*
-        osis = re.sub(r'\\nd\s+(.+?)\\nd\*',
-                      r'<divineName>\1</divineName>',
-                      osis, flags=re.DOTALL)
-
         # \pn_...\pn*
-        osis = re.sub(r'\\pn\s+(.+?)\\pn\*',
-                      r'<name>\1</name>',
-                      osis, flags=re.DOTALL)
-
-        # \qt_...\qt* # TODO:should this be <q>?
-        osis = re.sub(r'\\qt\s+(.+?)\\qt\*',
-                      r'<seg type="otPassage">\1</seg>',
-                      osis, flags=re.DOTALL)
-
+        # \qt_...\qt*
         # \sig_...\sig*
-        osis = re.sub(r'\\sig\s+(.+?)\\sig\*',
-                      r'<signed>\1</signed>',
-                      osis, flags=re.DOTALL)
-
         # \ord_...\ord*
-        osis = re.sub(r'\\ord\s+(.+?)\\ord\*',      # semantic incongruity:
-                      r'<hi type="super">\1</hi>',  # (ordinal -> superscript)
-                      osis, flags=re.DOTALL)
-
         # \tl_...\tl*
-        osis = re.sub(r'\\tl\s+(.+?)\\tl\*',
-                      r'<foreign>\1</foreign>',
-                      osis, flags=re.DOTALL)
-
         # \bk_...\bk*
-        osis = re.sub(r'\\bk\s+(.+?)\\bk\*',
-                      r'<name type="x-workTitle">\1</name>',
-                      osis, flags=re.DOTALL)
-
         # \k_...\k*
-        osis = re.sub(r'\\k\s+(.+?)\\k\*',
-                      r'<seg type="keyword">\1</seg>',
-                      osis, flags=re.DOTALL)
+        def tag_special_text(matchObject):
+            """Regex helper function to convert a USFM special text span to
+            its OSIS element, returning the element as a string. Spans of
+            other types nested within are converted too, as they were when
+            each type had a pass of its own.
+
+            Keyword arguments:
+            matchObject -- a regex match object in which the first element is
+            the tag name and the second is the text
+            """
+            (open_tag, close_tag) = _SPECIAL_TEXT_TAGS[matchObject.group(1)]
+            text = _RE_SPECIAL_TEXT.sub(tag_special_text, matchObject.group(2))
+            return open_tag + text + close_tag
+        osis = _RE_SPECIAL_TEXT.sub(tag_special_text, osis)
 
         # \lit
-        osis = re.sub(r'\\lit\s+(.*?)(?=(\\(i?m|i?p|nb|lit|cls|tr)\b|<(chapter eID|/?div|p|closer)\b))', lambda m: '\uFDD3<p type="x-liturgical">\n' + m.group(1) + '\uFDD3</p>\n', osis, flags=re.DOTALL)
+        osis = _RE_LIT.sub('\uFDD3<p type="x-liturgical">\n' + r'\1' +
+                           '\uFDD3</p>\n', osis)
 
         # \dc_...\dc*
         # TODO: Find an example---should this really be transChange?
-        osis = re.sub(r'\\dc\b\s*(.+?)\\dc\*',
-                      r'<transChange type="added" editions="dc">\1</transChange>',
-                      osis, flags=re.DOTALL)
+        osis = _RE_DC.sub(r'<transChange type="added" editions="dc">\1</transChange>',
+                          osis)
 
         # \sls_...\sls*
         # TODO: find a better mapping than <foreign>?
-        osis = re.sub(r'\\sls\b\s*(.+?)\\sls\*',
-                      r'<foreign>/1</foreign>',
-                      osis, flags=re.DOTALL)
+        osis = _RE_SLS.sub(r'<foreign>/1</foreign>', osis)
 
         if relaxed_conformance:
             # \addpn...\addpn*
-            osis = re.sub(r'\\addpn\s+(.+?)\\addpn\*',
-                          r'<hi type="x-dotUnderline">\1</hi>',
-                          osis, flags=re.DOTALL)
+            osis = _RE_ADDPN.sub(r'<hi type="x-dotUnderline">\1</hi>', osis)
             # \k# # TODO: unsure of this tag's purpose
-            osis = re.sub(r'\\k1\s+(.+?)\\k1\*',
-                          r'<seg type="keyword" n="1">\1</seg>',
-                          osis, flags=re.DOTALL)
-            osis = re.sub(r'\\k2\s+(.+?)\\k2\*',
-                          r'<seg type="keyword" n="2">\1</seg>',
-                          osis, flags=re.DOTALL)
-            osis = re.sub(r'\\k3\s+(.+?)\\k3\*',
-                          r'<seg type="keyword" n="3">\1</seg>',
-                          osis, flags=re.DOTALL)
-            osis = re.sub(r'\\k4\s+(.+?)\\k4\*',
-                          r'<seg type="keyword" n="4">\1</seg>',
-                          osis, flags=re.DOTALL)
-            osis = re.sub(r'\\k5\s+(.+?)\\k5\*',
-                          r'<seg type="keyword" n="5">\1</seg>',
-                          osis, flags=re.DOTALL)
+            def tag_keyword(matchObject):
+                """Regex helper function to convert USFM \\k#, returning the
+                OSIS <seg/> as a string. Keywords of other levels nested
+                within are converted too, as they were when each level had a
+                pass of its own.
+
+                Keyword arguments:
+                matchObject -- a regex match object in which the first element
+                is the level and the second is the keyword
+                """
+                keyword = _RE_K_NUM.sub(tag_keyword, matchObject.group(2))
+                return ('<seg type="keyword" n="' + matchObject.group(1) +
+                        '">' + keyword + '</seg>')
+            osis = _RE_K_NUM.sub(tag_keyword, osis)
 
         return osis
 
-    def cvt_character_styling(osis, relaxed_conformance):
+    def cvt_character_styling(osis, relaxed_conformance, present_tags):
         """Converts USFM **Character Styling** tags to OSIS, returning the
         processed text as a string.
 
@@ -863,36 +1299,35 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         osis -- The document as a string.
         relaxed_conformance -- Boolean value indicating whether to process
         non-standard & deprecated USFM tags.
+        present_tags -- The set of tag names (without digits) in the document
+        after the relaxed conformance remaps.
         """
-        # \em_...\em*
-        osis = re.sub(r'\\em\s+(.+?)\\em\*',
-                      r'<hi type="emphasis">\1</hi>',
-                      osis, flags=re.DOTALL)
+        # no pass ahead of this one produces any character style tag, so
+        # the names found in the document say whether there is any work
+        # to do
+        if present_tags.isdisjoint(_STYLE_TAGS):
+            return osis
 
+        # \em_...\em*
         # \bd_...\bd*
-        osis = re.sub(r'\\bd\s+(.+?)\\bd\*',
-                      r'<hi type="bold">\1</hi>',
-                      osis, flags=re.DOTALL)
-
         # \it_...\it*
-        osis = re.sub(r'\\it\s+(.+?)\\it\*',
-                      r'<hi type="italic">\1</hi>',
-                      osis, flags=re.DOTALL)
-
         # \bdit_...\bdit*
-        osis = re.sub(r'\\bdit\s+(.+?)\\bdit\*',
-                      r'<hi type="bold"><hi type="italic">\1</hi></hi>',
-                      osis, flags=re.DOTALL)
-
         # \no_...\no*
-        osis = re.sub(r'\\no\s+(.+?)\\no\*',
-                      r'<hi type="normal">\1</hi>',
-                      osis, flags=re.DOTALL)
-
         # \sc_...\sc*
-        osis = re.sub(r'\\sc\s+(.+?)\\sc\*',
-                      r'<hi type="small-caps">\1</hi>',
-                      osis, flags=re.DOTALL)
+        def tag_style(matchObject):
+            """Regex helper function to convert a USFM character style span to
+            an OSIS <hi/>, returning the element as a string. Spans of other
+            styles nested within are converted too, as they were when each
+            style had a pass of its own.
+
+            Keyword arguments:
+            matchObject -- a regex match object in which the first element is
+            the tag name and the second is the text
+            """
+            (open_tag, close_tag) = _STYLE_TAGS[matchObject.group(1)]
+            return (open_tag + _RE_STYLE.sub(tag_style, matchObject.group(2)) +
+                    close_tag)
+        osis = _RE_STYLE.sub(tag_style, osis)
 
         return osis
 
@@ -914,9 +1349,8 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         osis = osis.replace('//', '<lb type="x-optional"/>')
 
         # \pb
-        osis = re.sub(r'\\pb\s*',
-                      '<milestone type="pb"/>\n',
-                      osis, flags=re.DOTALL)
+        if '\\pb' in osis:
+            osis = _RE_PB.sub('<milestone type="pb"/>\n', osis)
 
         return osis
 
@@ -967,40 +1401,42 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
             figure += '</figure>'
             return figure
 
-        osis = re.sub(r'\\fig\b\s+([^\|]*)\s*\|([^\|]*)\s*\|([^\|]*)\s*\|([^\|]*)\s*\|([^\|]*)\s*\|([^\|]*)\s*\|([^\\]*)\s*\\fig\*', make_figure, osis)
+        if '\\fig' in osis:
+            osis = _RE_FIG.sub(make_figure, osis)
 
         # \ndx_...\ndx*
         # TODO: tag with x-glossary instead of <index/>? Is <index/>
         #       containerable?
-        osis = re.sub(r'\\ndx\s+(.+?)(\s*)\\ndx\*',
-                      r'\1<index index="Index" level1="\1"/>\2',
-                      osis, flags=re.DOTALL)
+        if '\\ndx' in osis:
+            osis = _RE_NDX.sub(r'\1<index index="Index" level1="\1"/>\2',
+                               osis)
 
         # \pro_...\pro*
-        osis = re.sub(r'([^\s]+)(\s*)\\pro\s+(.+?)(\s*)\\pro\*',
-                      r'<w xlit="\3">\1</w>\2\4',
-                      osis, flags=re.DOTALL)
+        if '\\pro' in osis:
+            osis = _RE_PRO.sub(r'<w xlit="\3">\1</w>\2\4', osis)
 
         # \w_...\w*
-        osis = re.sub(r'\\w\s+(.+?)(\s*)\\w\*',
-                      r'\1<index index="Glossary" level1="\1"/>\2',
-                      osis, flags=re.DOTALL)
-
         # \wg_...\wg*
-        osis = re.sub(r'\\wg\s+(.+?)(\s*)\\wg\*',
-                      r'\1<index index="Greek" level1="\1"/>\2',
-                      osis, flags=re.DOTALL)
-
         # \wh_...\wh*
-        osis = re.sub(r'\\wh\s+(.+?)(\s*)\\wh\*',
-                      r'\1<index index="Hebrew" level1="\1"/>\2',
-                      osis, flags=re.DOTALL)
+        # \wr...\wr*
+        w_regex = _RE_W_RELAXED if relaxed_conformance else _RE_W
 
-        if relaxed_conformance:
-            # \wr...\wr*
-            osis = re.sub(r'\\wr\s+(.+?)(\s*)\\wr\*',
-                          r'\1<index index="Reference" level1="\1"/>\2',
-                          osis, flags=re.DOTALL)
+        def tag_word(matchObject):
+            """Regex helper function to convert USFM \\w, \\wg, \\wh and \\wr
+            to an OSIS <index/> following the word, returning the result as a
+            string. Words of the other types nested within are converted too,
+            as they were when each type had a pass of its own.
+
+            Keyword arguments:
+            matchObject -- a regex match object in which the elements are the
+            tag name, the word and the whitespace preceding the closing tag
+            """
+            word = w_regex.sub(tag_word, matchObject.group(2))
+            index = _W_INDEXES[matchObject.group(1)]
+            return (word + '<index index="' + index + '" level1="' + word +
+                    '"/>' + matchObject.group(3))
+        if '\\w' in osis:
+            osis = w_regex.sub(tag_word, osis)
 
         return osis
 
@@ -1036,9 +1472,8 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
             periph += '">\n' + contents + '</div>\n'
             return periph
 
-        osis = re.sub(r'\\periph\s+([^' + '\n' + r']+)\s*' + '\n' +
-                      r'(.+?)(?=(</div type="book">|\\periph\s+))',
-                      tag_periph, osis, flags=re.DOTALL)
+        if '\\periph' in osis:
+            osis = _RE_PERIPH.sub(tag_periph, osis)
 
         return osis
 
@@ -1054,41 +1489,32 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         non-standard & deprecated USFM tags.
         """
         # \ef...\ef*
-        osis = re.sub(r'\\ef\s+([^\s\\]+?)\s*(.+?)\s*\\ef\*',
-                      lambda m: '<note' + ((' n=""') if
-                                           (m.group(1) == '-') else
-                                           ('' if (m.group(1) == '+') else
-                                            (' n="' + m.group(1) + '"'))) +
-                      ' type="study">' + m.group(2) + '\uFDDF</note>',
-                      osis, flags=re.DOTALL)
-        osis = re.sub(r'(<note\b[^>]*?>.*?</note>)',
-                      lambda m: process_note(m.group(1)),
-                      osis, flags=re.DOTALL)
+        if '\\ef' in osis:
+            osis = _RE_EF.sub(lambda m: make_note(m.group(1), 'type="study"',
+                                                  m.group(2)), osis)
+        # this also reprocesses the footnotes and cross references converted
+        # earlier, so it can't be skipped along with \ef
+        if '<note' in osis:
+            osis = _RE_NOTE.sub(lambda m: process_note(m.group(1)), osis)
 
         # \ex...\ex*
-        osis = re.sub(r'\\ex\s+([^\s]+?)\s+(.+?)\s*\\ex\*',
-                      lambda m: '<note' + ((' n=""') if
-                                           (m.group(1) == '-') else
-                                           ('' if (m.group(1) == '+') else
-                                            (' n="' + m.group(1) + '"'))) +
-                      ' type="crossReference" subType="x-study"><reference>' +
-                      m.group(2) + '</reference>\uFDDF</note>',
-                      osis, flags=re.DOTALL)
-        osis = re.sub(r'(<note [^>]*?type="crossReference"[^>]*>.*?</note>)',
-                      lambda m: process_xref(m.group(1)),
-                      osis, flags=re.DOTALL)
+        if '\\ex' in osis:
+            osis = _RE_EX.sub(lambda m: make_note(
+                m.group(1), 'type="crossReference" subType="x-study"',
+                '<reference>' + m.group(2) + '</reference>'), osis)
+        if '<note' in osis:
+            osis = _RE_XREF_NOTE.sub(lambda m: process_xref(m.group(1)), osis)
 
         # \esb...\esbex
         # TODO: this likely needs to go much earlier in the process
-        osis = re.sub(r'\\esb\b\s*(.+?)\\esbe\b\s*',
-                      '\uFDD5<div type="x-sidebar">' + r'\1' +
-                      '</div>\uFDD5\n',
-                      osis, flags=re.DOTALL)
+        if '\\esb' in osis:
+            osis = _RE_ESB.sub('\uFDD5<div type="x-sidebar">' + r'\1' +
+                               '</div>\uFDD5\n', osis)
 
         # \cat_<TAG>\cat*
-        osis = re.sub(r'\\cat\b\s+(.+?)\\cat\*',
-                      r'<index index="category" level1="\1"/>',
-                      osis)
+        if '\\cat' in osis:
+            osis = _RE_CAT.sub(r'<index index="category" level1="\1"/>',
+                               osis)
 
         return osis
 
@@ -1114,15 +1540,14 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         # TODO: Decide how these should actually be encoded. In lieu of that,
         # these can all be handled by the default \z Namespace handlers:
 
+        if '\\z' not in osis:
+            return osis
+
         # \z{X}...\z{X}*
-        osis = re.sub(r'\\z([^\s]+)\s(.+?)(\\z\1\*)',
-                      r'<seg type="x-\1">\2</seg>',
-                      osis, flags=re.DOTALL)
+        osis = _RE_Z_SPAN.sub(r'<seg type="x-\1">\2</seg>', osis)
 
         # \z{X}
-        osis = re.sub(r'\\z([^\s]+)',
-                      r'<milestone type="x-usfm-z-\1"/>',
-                      osis)
+        osis = _RE_Z.sub(r'<milestone type="x-usfm-z-\1"/>', osis)
 
         return osis
 
@@ -1135,65 +1560,23 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         Keyword arguments:
         osis -- The document as a string.
         """
-        # TODO: add support for subverses, including in ranges/series,
-        #       e.g. Matt.1.1!b-Matt.2.5,Matt.2.7!a
-
-        # TODO: make sure that descending ranges generate invalid markup
-        #       (osisID="") expand verse ranges, series
-        def expand_range(v_range):
-            """Expands a verse range into its constituent verses as a string.
-
-            Keyword arguments:
-            vRange -- A string of the lower & upper bounds of the range, with a
-            hypen in between.
-            """
-            v_range = re.findall(r'\d+', v_range)
-            osisID = list()
-            for n in range(int(v_range[0]), int(v_range[1])+1):
-                osisID.append('$BOOK$.$CHAP$.'+str(n))
-            return ' '.join(osisID)
-
-        osis = re.sub(r'\$BOOK\$\.\$CHAP\$\.(\d+-\d+)"',
-                      lambda m: expand_range(m.group(1))+'"',
-                      osis)
-
-        def expand_series(v_series):
-            """Expands a verse series (list) into its constituent verses as a
-            string.
-
-            Keyword arguments:
-            vSeries -- A comma-separated list of verses.
-            """
-            v_series = re.findall(r'\d+', v_series)
-            osisID = list()
-            for n in v_series:
-                osisID.append('$BOOK$.$CHAP$.'+str(n))
-            return ' '.join(osisID)
-
-        osis = re.sub(r'\$BOOK\$\.\$CHAP\$\.(\d+(,\d+)+)"',
-                      lambda m: expand_series(m.group(1))+'"',
-                      osis)
-
         # fill in book & chapter values
         book_chunks = osis.split('\uFDD0')
-        osis = ''
-        for bc in book_chunks:
-            book_value = re.search(r'<div type="book" osisID="([^"]+?)"', bc)
+        for (i, bc) in enumerate(book_chunks):
+            book_value = _RE_BOOK_ID.search(bc)
             if book_value:
                 book_value = book_value.group(1)
                 bc = bc.replace('$BOOK$', book_value)
                 chap_chunks = bc.split('\uFDD1')
-                newbc = ''
-                for cc in chap_chunks:
-                    chap_value = re.search(r'<chapter osisID="[^\."]+\.([^"]+)',
-                                           cc)
+                for (j, cc) in enumerate(chap_chunks):
+                    if '$CHAP$' not in cc:
+                        continue
+                    chap_value = _RE_CHAPTER_ID.search(cc)
                     if chap_value:
                         chap_value = chap_value.group(1)
-                        cc = cc.replace('$CHAP$', chap_value)
-                    newbc += cc
-                bc = newbc
-            osis += bc
-        return osis
+                        chap_chunks[j] = cc.replace('$CHAP$', chap_value)
+                book_chunks[i] = ''.join(chap_chunks)
+        return ''.join(book_chunks)
 
     def osis_reorder_and_cleanup(osis):
         """Perform postprocessing on an OSIS document, returning the processed
@@ -1207,70 +1590,102 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
         non-standard & deprecated USFM tags.
         """
         # assorted re-orderings
-        osis = re.sub('(\uFDD3<chapter eID=.+?\n)(<verse eID=.+?>\uFDD2)\n?',
-                      r'\2' + '\n' + r'\1', osis)
-        osis = re.sub('([\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9]</div>)([^\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9]*<chapter eID.+?>)', r'\2\1', osis)
-        osis = re.sub('(\uFDD3</p>\n?\uFDD3<p>)\n?(<verse eID=.+?>\uFDD2)\n?',
-                      r'\2' + '\n' + r'\1' + '\n', osis)
-        osis = re.sub('\n(<verse eID=.+?>\uFDD2)', r'\1' + '\n', osis)
-        osis = re.sub('\n*(<l.+?>)(<verse eID=.+?>[\uFDD2\n]*<verse osisID=.+?>)', r'\2\1', osis)
-        osis = re.sub('(</l>)(<note .+?</note>)', r'\2\1', osis)
+        osis = _RE_VERSE_END_AFTER_CHAPTER.sub(r'\2' + '\n' + r'\1', osis)
+        osis = _RE_MS_END_BEFORE_CHAPTER.sub(r'\2\1', osis)
+        osis = _RE_VERSE_END_AFTER_P.sub(r'\2' + '\n' + r'\1' + '\n', osis)
+        osis = _RE_VERSE_END_AFTER_NEWLINE.sub(r'\1' + '\n', osis)
+        osis = _RE_VERSES_AFTER_L.sub(r'\2\1', osis)
+        osis = _RE_NOTE_AFTER_L.sub(r'\2\1', osis)
 
         # delete attributes from end tags (since they are invalid)
-        osis = re.sub(r'(</[^\s>]+) [^>]*>', r'\1>', osis)
+        osis = _RE_END_TAG_ATTRIBUTES.sub(r'\1>', osis)
         osis = osis.replace('<lb type="x-p"/>', '<lb/>')
 
         # delete Unicode non-characters
-        for c in '\uFDD0\uFDD1\uFDD2\uFDD3\uFDD4\uFDD5\uFDD6\uFDD7\uFDD8\uFDD9\uFDDA\uFDDB\uFDDC\uFDDD\uFDDE\uFDDF\uFDE0\uFDE1\uFDE2\uFDE3\uFDE4\uFDE5\uFDE6\uFDE7\uFDE8\uFDE9\uFDEA\uFDEB\uFDEC\uFDED\uFDEE\uFDEF':
-            osis = osis.replace(c, '')
+        osis = osis.translate(_NONCHARACTER_DELETION)
 
-        for end_block in ['p', 'div', 'note', 'l', 'lg', 'chapter', 'verse',
-                          'head', 'title', 'item', 'list']:
-            osis = re.sub('\s+</'+end_block+'>', '</'+end_block+r'>\n', osis)
-            osis = re.sub('\s+<'+end_block+'( eID=[^/>]+/>)',
-                          '<'+end_block+r'\1' + '\n', osis)
-        osis = re.sub(' +((</[^>]+>)+) *', r'\1 ', osis)
+        def move_end_block_spaces(matchObject):
+            """Regex helper function to move the whitespace preceding block
+            end tags and eID milestones to a newline following them, returning
+            the run of tags as a string.
+
+            The tags used to be handled one name at a time, end tags before
+            milestones, so the newline left after a tag is absorbed by the
+            next one only if that one was handled later. Each tag is ranked
+            by that order to give the same result in a single pass.
+
+            Keyword arguments:
+            matchObject -- a regex match object containing a run of end tags
+            and milestones separated by optional whitespace
+            """
+            run = []
+            moved = False
+            rank = None
+            for tag in _RE_END_BLOCK.finditer(matchObject.group(0)):
+                if tag.group(2):
+                    tag_rank = (_END_BLOCK_RANKS[tag.group(2)], 0)
+                else:
+                    tag_rank = (_END_BLOCK_RANKS[tag.group(3)], 1)
+                if moved and tag_rank <= rank:
+                    run.append('\n')
+                moved = bool(tag.group(1)) or (moved and rank < tag_rank)
+                rank = tag_rank
+                run.append(tag.group(0)[len(tag.group(1)):])
+            if moved:
+                run.append('\n')
+            return ''.join(run)
+        osis = _RE_END_BLOCK_RUN.sub(move_end_block_spaces, osis)
+        osis = _RE_SPACES_BEFORE_END_TAGS.sub(r'\1 ', osis)
 
         # strip extra spaces & newlines
-        osis = re.sub('  +', ' ', osis)
-        osis = re.sub(' ?\n\n+', '\n', osis)
+        osis = _RE_MULTIPLE_SPACES.sub(' ', osis)
+        osis = _RE_BLANK_LINES.sub('\n', osis)
         return osis
 
     # --  Processing starts here
-    if encoding:
-        osis = codecs.open(sFile, 'r', encoding).read().strip() + '\n'
-    else:
+    with open(sFile, 'rb') as usfm_file:
+        usfm = usfm_file.read()
+    if not encoding:
         encoding = 'utf-8'
-        osis = codecs.open(sFile, 'r', encoding).read().strip() + '\n'
-        # \ide_<ENCODING>
-        encoding = re.search(r'\\ide\s+(.+)' + '\n', osis)
-        if encoding:
-            encoding = encoding.group(1).lower().strip()
-            if encoding != 'utf-8':
-                if encoding in aliases:
-                    osis = codecs.open(sFile, 'r',
-                                       encoding).read().strip() + '\n'
-                else:
-                    print(('WARNING: Encoding "' + encoding +
-                           '" unknown, processing ' + sFile + ' as UTF-8'))
-                    encoding = 'utf-8'
+        # \ide_<ENCODING>, looked for in the undecoded text, so that the file
+        # is only decoded once, and only with the encoding it names
+        ide = _RE_IDE.search(usfm)
+        if ide:
+            ide = ide.group(1).decode('ascii', 'replace').lower().strip()
+            if ide in aliases:
+                encoding = ide
+            elif ide != 'utf-8':
+                print(('WARNING: Encoding "' + ide +
+                       '" unknown, processing ' + sFile + ' as UTF-8'))
+    osis = usfm.decode(encoding).strip() + '\n'
 
     osis = osis.lstrip(_unichr(0xFEFF))
 
     # call individual conversion processors in series
+    # Each processor runs over the whole document rather than over chapter
+    # chunks: sections and major sections are only closed by the next one
+    # (or the next book), often several chapters later, and the $BOOK$
+    # placeholders are filled in per book, so chapters can't be converted
+    # independently without changing the output. Splitting by book doesn't
+    # pay either: the book division opened by \id runs to the end of the
+    # document, so a document holds a single book, and the usfm2osis script
+    # already converts documents in parallel worker processes.
     osis = cvt_preprocess(osis, relaxed_conformance)
     osis = cvt_relaxed_conformance_remaps(osis, relaxed_conformance)
+    # names of the tags in the document, found once so that the passes given
+    # them can skip tags it doesn't use
+    present_tags = set(_RE_TAG_NAME.findall(osis))
     osis = cvt_identification(osis, relaxed_conformance)
-    osis = cvt_introductions(osis, relaxed_conformance)
+    osis = cvt_introductions(osis, relaxed_conformance, present_tags)
     osis = cvt_titles(osis, relaxed_conformance)
     osis = cvt_chapters_and_verses(osis, relaxed_conformance)
     osis = cvt_paragraphs(osis, relaxed_conformance)
     osis = cvt_poetry(osis, relaxed_conformance)
-    osis = cvt_tables(osis, relaxed_conformance)
+    osis = cvt_tables(osis, relaxed_conformance, present_tags)
     osis = cvt_footnotes(osis, relaxed_conformance)
     osis = cvt_cross_references(osis, relaxed_conformance)
-    osis = cvt_special_text(osis, relaxed_conformance)
-    osis = cvt_character_styling(osis, relaxed_conformance)
+    osis = cvt_special_text(osis, relaxed_conformance, present_tags)
+    osis = cvt_character_styling(osis, relaxed_conformance, present_tags)
     osis = cvt_spacing_and_breaks(osis, relaxed_conformance)
     osis = cvt_special_features(osis, relaxed_conformance)
     osis = cvt_peripherals(osis, relaxed_conformance)
@@ -1281,12 +1696,14 @@ def ConvertToOSIS(sFile, relaxed_conformance=False, encoding='', debug=False,
     osis = osis_reorder_and_cleanup(osis)
 
     # change type on special books
-    for sb in SPECIAL_BOOKS:
-        osis = osis.replace('<div type="book" osisID="' + sb + '">',
-                            '<div type="' + sb.lower() + '">')
+    osis = _RE_SPECIAL_BOOK.sub(lambda m: '<div type="' + m.group(1).lower() +
+                                '">', osis)
 
     if debug:
-        local_unhandled_tags = set(re.findall(r'(\\[^\s]*)', osis))
+        local_unhandled_tags = set()
+        if '\\' in osis:
+            local_unhandled_tags.update(m.group() for m in
+                                        _RE_UNHANDLED_TAG.finditer(osis))
         if local_unhandled_tags:
             print(('Unhandled USFM tags in ' + sFile + ': ' +
                    ', '.join(local_unhandled_tags) + ' (' +
@@ -321,9 +321,9 @@ def main(args=None):
         # create a queue to pass to workers to store the results
         result_queue = multiprocessing.Queue()
 
-        # spawn workers
+        # spawn workers (no more than there are documents to convert)
         print('Converting USFM documents to OSIS...')
-        for i in _range(num_processes):
+        for i in _range(min(num_processes, len(usfm_doc_list))):
             worker = Worker(work_queue, result_queue)
             worker.start()
 
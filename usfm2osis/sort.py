@@ -18,63 +18,63 @@ The full text of the GNU General Public License is available at:
 """
 
 from __future__ import unicode_literals
+import re
 from .bookdata import CANONICAL_ORDER, USFM_NUMERIC_ORDER, FILENAME_TO_OSIS
 
+_RE_DIGITS = re.compile(r'(\d+)', re.UNICODE)
+
+# position of each OSIS book in the two orders, looked up by key_canon and
+# key_usfm rather than searching the order tuples for each file
+_CANON_RANKS = dict((osis, rank) for (rank, osis) in
+                    enumerate(CANONICAL_ORDER))
+_USFM_RANKS = dict((osis, rank) for (rank, osis) in
+                   enumerate(USFM_NUMERIC_ORDER))
+# rank of files whose book is unknown, after every known book; an int rather
+# than float('inf'), so that all keys are of one type
+_UNKNOWN_CANON_RANK = len(CANONICAL_ORDER)
+_UNKNOWN_USFM_RANK = len(USFM_NUMERIC_ORDER)
+
 
-# BEGIN PSF-licensed segment
-# keynat from:
-# http://code.activestate.com/recipes/285264-natural-string-sorting/
 def key_natural(string):
-    """A natural sort helper function for sort() and sorted() without using
-    regular expressions or exceptions.
+    """A natural sort helper function for sort() and sorted(), returning the
+    runs of digits in string as integers and the text between them in lower
+    case, each in a tuple of the same shape, so that keys can always be
+    compared and a number sorts before text.
 
     >>> items = ('Z', 'a', '10th', '1st', '9')
     >>> sorted(items)
     ['10th', '1st', '9', 'Z', 'a']
-    >>> sorted(items, key=keynat)
+    >>> sorted(items, key=key_natural)
     ['1st', '9', '10th', 'a', 'Z']
     """
-    item = type(1)
-    sorted_list = []
-    for char in string:
-        if char.isdigit():
-            digit = int(char)
-            if sorted_list and type(sorted_list[-1]) == item:
-                sorted_list[-1] = sorted_list[-1] * 10 + digit
-            else:
-                sorted_list.append(digit)
-        else:
-            sorted_list.append(char.lower())
-    return sorted_list
-# END PSF-licensed segment
+    # splitting on a captured group puts the digit runs at the odd indices
+    return [(0, int(part), '') if i % 2 else (1, 0, part)
+            for (i, part) in enumerate(_RE_DIGITS.split(string.lower()))
+            if part]
 
 
 def key_canon(filename):
     """Sort helper function that orders according to canon position (defined in
-    canonicalOrder list), returning canonical position or infinity if not in
-    the list.
+    canonicalOrder list), returning canonical position or a position after
+    the end of the list if not in it.
     """
-    if filename in FILENAME_TO_OSIS:
-        return CANONICAL_ORDER.index(FILENAME_TO_OSIS[filename])
-    return float('inf')
+    return _CANON_RANKS.get(FILENAME_TO_OSIS.get(filename),
+                            _UNKNOWN_CANON_RANK)
 
 
 def key_usfm(filename):
     """Sort helper function that orders according to USFM book number (defined
-    in usfmNumericOrder list), returning USFM book number or infinity if not in
-    the list.
+    in usfmNumericOrder list), returning USFM book number or a number after
+    the end of the list if not in it.
     """
-    if filename in FILENAME_TO_OSIS:
-        return USFM_NUMERIC_ORDER.index(FILENAME_TO_OSIS[filename])
-    return float('inf')
+    return _USFM_RANKS.get(FILENAME_TO_OSIS.get(filename),
+                           _UNKNOWN_USFM_RANK)
 
 
 def key_supplied(dummy_val):
     """Sort helper function that keeps the items in the order in which they
-    were supplied (i.e. it doesn't sort at all), returning the number of times
-    the function has been called.
+    were supplied (i.e. it doesn't sort at all), returning the same key for
+    every item; sort() and sorted() are stable, so equal keys keep their
+    order.
     """
-    if not hasattr(key_supplied, "counter"):
-        key_supplied.counter = 0
-    key_supplied.counter += 1
-    return key_supplied.counter
+    return 0